@@ -0,0 +1,121 @@
+# app/embeddings.py
+
+# Pluggable embedding provider shared by ingestion and the retrievers.
+#
+#   EMBEDDING_PROVIDER=openai  -> OpenAIEmbeddings (network round-trip per query)
+#   EMBEDDING_PROVIDER=local   -> sentence-embedding model on CPU via transformers
+#
+# Local mode needs no network once the model is on disk: point
+# LOCAL_EMBEDDING_MODEL at a local directory (or a pre-downloaded HF cache and
+# set HF_HUB_OFFLINE=1).
+
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+LOCAL_EMBEDDING_MODEL = os.getenv(
+    "LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+)
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "2"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+QUERY_CACHE_SIZE = int(os.getenv("EMBEDDING_QUERY_CACHE_SIZE", "1024"))
+# OpenAI mode tokenizes with tiktoken to split over-long inputs; that downloads
+# the tokenizer on first use. Set to false to send raw text (e.g. offline
+# against the load-test stub).
+OPENAI_EMBEDDING_TOKENIZE = (
+    os.getenv("OPENAI_EMBEDDING_TOKENIZE", "true").lower() != "false"
+)
+
+
+class LocalEmbeddings(Embeddings):
+    """Mean-pooled sentence embeddings from a local transformers model (CPU)."""
+
+    def __init__(
+        self,
+        model_name: str = LOCAL_EMBEDDING_MODEL,
+        num_threads: int = EMBEDDING_THREADS,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ):
+        # Imported lazily so the OpenAI path never pays for loading torch
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self._torch = torch
+        torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+        self._embed_query_cached = lru_cache(maxsize=QUERY_CACHE_SIZE)(
+            self._embed_query
+        )
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        torch = self._torch
+        batch = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=256, return_tensors="pt"
+        )
+        with torch.inference_mode():
+            hidden = self.model(**batch).last_hidden_state
+        mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        return pooled.tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[start : start + self.batch_size]))
+        return vectors
+
+    def _embed_query(self, text: str) -> tuple[float, ...]:
+        return tuple(self._encode([text])[0])
+
+    def embed_query(self, text: str) -> list[float]:
+        return list(self._embed_query_cached(text))
+
+    def warm_up(self):
+        # First forward pass allocates buffers / builds kernels; do it at startup
+        self._encode(["warm-up"] * min(self.batch_size, 4))
+        self._encode(["warm-up"])
+
+
+def _build_openai_embeddings() -> Embeddings:
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        check_embedding_ctx_length=OPENAI_EMBEDDING_TOKENIZE,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> Embeddings:
+    """Return the process-wide embedding model selected by EMBEDDING_PROVIDER."""
+    if EMBEDDING_PROVIDER == "local":
+        return LocalEmbeddings()
+    if EMBEDDING_PROVIDER == "openai":
+        return _build_openai_embeddings()
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {EMBEDDING_PROVIDER!r}")
+
+
+def embedding_metadata() -> dict:
+    """Provider/model tags written alongside indexes and chunks at ingestion."""
+    if EMBEDDING_PROVIDER == "local":
+        model = LOCAL_EMBEDDING_MODEL
+    else:
+        model = getattr(get_embeddings(), "model", "openai")
+    return {"embedding_provider": EMBEDDING_PROVIDER, "embedding_model": model}
+
+
+def warm_up_embeddings():
+    """Load the local model and run a first inference (called from app lifespan)."""
+    if EMBEDDING_PROVIDER != "local":
+        return
+    get_embeddings().warm_up()
@@ -0,0 +1,166 @@
+# app/llm_gateway.py
+
+# Shared gateway in front of the chat model.
+#
+# - Adaptive concurrency (AIMD): the number of in-flight upstream calls grows by
+#   ~1 per "window" of fast successes and is cut multiplicatively on 429s or
+#   when latency exceeds the target.
+# - Priority: interactive /ask calls are admitted before bulk intake calls.
+# - Single-flight: identical prompts already in flight share one upstream call.
+# - Retries live here, not in the SDK (build the model with max_retries=0): a
+#   429 reaches the limiter on the first attempt, and the slot is released
+#   while we back off instead of being held through SDK-internal retries.
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+
+INTERACTIVE = 0
+BULK = 1
+
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "2"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+LLM_INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", "8"))
+LLM_LATENCY_TARGET_SECONDS = float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "5"))
+LLM_BACKOFF_FACTOR = float(os.getenv("LLM_BACKOFF_FACTOR", "0.5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    """True for provider 429s (openai.RateLimitError or anything with a 429)."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429s, provider 5xx and connection/timeout errors are worth retrying."""
+    if is_rate_limited(exc):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status >= 500
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a priority-ordered wait queue."""
+
+    def __init__(
+        self,
+        initial: int = LLM_INITIAL_CONCURRENCY,
+        min_limit: int = LLM_MIN_CONCURRENCY,
+        max_limit: int = LLM_MAX_CONCURRENCY,
+        latency_target: float = LLM_LATENCY_TARGET_SECONDS,
+        backoff: float = LLM_BACKOFF_FACTOR,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._last_decrease = 0.0
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted a slot just as we were cancelled: hand it back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            self._decrease()
+            return
+        # Additive increase: +1 per `limit` successful calls
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_overload(self):
+        self._decrease()
+
+    def _decrease(self):
+        # A burst of 429s from one overload episode should only back off once
+        now = time.monotonic()
+        if now - self._last_decrease < self.latency_target:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+
+class LLMGateway:
+    """Wraps a LangChain chat model with AIMD limiting and single-flight."""
+
+    def __init__(
+        self,
+        llm,
+        limiter: AdaptiveLimiter = None,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_base: float = LLM_RETRY_BASE_SECONDS,
+    ):
+        self.llm = llm
+        self.limiter = limiter or AdaptiveLimiter()
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self._in_flight = {}
+
+    async def ainvoke(self, prompt: str, priority: int = INTERACTIVE):
+        task = self._in_flight.get(prompt)
+        if task is None:
+            task = asyncio.ensure_future(self._call(prompt, priority))
+            self._in_flight[prompt] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(prompt, None))
+        # Shield so one caller disconnecting doesn't cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _call(self, prompt: str, priority: int):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._attempt(prompt, priority)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+            # Back off without holding a slot (jittered exponential)
+            delay = self.retry_base * 2**attempt
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+
+    async def _attempt(self, prompt: str, priority: int):
+        await self.limiter.acquire(priority)
+        start = time.monotonic()
+        try:
+            result = await self.llm.ainvoke(prompt)
+        except Exception as e:
+            if is_rate_limited(e):
+                self.limiter.on_overload()
+            raise
+        finally:
+            self.limiter.release()
+        self.limiter.on_success(time.monotonic() - start)
+        return result
@@ -1,21 +1,47 @@
+import asyncio
 import os
-from datetime import datetime
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import Body, Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from langchain_openai import ChatOpenAI
 
+from app.embeddings import warm_up_embeddings
+from app.llm_gateway import BULK, INTERACTIVE, LLMGateway
+
 # --- Import your source-of-truth Pydantic model ---
 from app.models.source_of_truth import SourceOfTruth
+from app.profiling import PROFILES, ProfileMiddleware, get_profile
 from app.query_models import AskRequest, AskResponse, SourceAttribution
-from app.retrievers.registry import RETRIEVERS, get_retrievers
+from app.retrievers.base import RetrievalRequestError
+from app.retrievers.registry import RETRIEVERS, get_resilient_retrievers
+from app.scoring import ScoringEngine
+from app.sidecar_client import (
+    SidecarError,
+    shared_mode,
+    sidecar_call,
+    wait_for_sidecar,
+)
 
 from .auth import fake_users_db
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if shared_mode():
+        # Indexes and the embedding model live in the sidecar; wait until it's up
+        wait_for_sidecar()
+    else:
+        # Load the local embedding model (if configured) before taking traffic
+        warm_up_embeddings()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,8 +49,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Id"],
 )
-
 # --- Load .env and keys ---
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
@@ -58,6 +84,35 @@ def verify_token(token: str = Depends(oauth2_scheme)):
         )
 
 
+def has_valid_token(headers) -> bool:
+    scheme, _, token = headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    return True
+
+
+# Opt-in request profiling: PROFILE_SAMPLE_RATE, or X-Profile: 1 with a valid
+# token (anonymous clients can't force the sampler on)
+app.add_middleware(ProfileMiddleware, authorize=has_valid_token)
+
+
+# --- Health Endpoint ---
+# Readiness for load balancers / Docker HEALTHCHECK: in shared mode a worker is
+# only healthy while it can reach the index sidecar.
+@app.get("/health")
+def health():
+    if shared_mode():
+        try:
+            sidecar_call("ping")
+        except SidecarError as e:
+            raise HTTPException(status_code=503, detail=f"Sidecar unavailable: {e}")
+    return {"status": "ok"}
+
+
 # --- Token Endpoint ---
 @app.post("/token")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
@@ -85,11 +140,33 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+# --- Admin: request profiles (see app/profiling.py) ---
+@app.get("/admin/profiles")
+def list_profiles(token_data=Depends(verify_token)):
+    return [record.summary() for record in reversed(PROFILES)]
+
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: str, token_data=Depends(verify_token)):
+    """Collapsed stacks for flamegraph.pl / speedscope / inferno."""
+    record = get_profile(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        record.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{record.id}.folded"'},
+    )
+
+
 # --- LLM Init ---
-llm = ChatOpenAI(model="gpt-3.5-turbo", openai_api_key=api_key)
+# No SDK retries: the gateway retries after releasing its slot, so 429s reach
+# its limiter immediately
+llm = ChatOpenAI(model="gpt-3.5-turbo", openai_api_key=api_key, max_retries=0)
+# All LLM calls go through the gateway (adaptive limit, priority, single-flight)
+llm_gateway = LLMGateway(llm)
 
 
-def generate_llm_explanation(job_description, obj, obj_type):
+async def generate_llm_explanation(job_description, obj, obj_type):
     # Build a tailored summary string
     if obj_type == "skill":
         summary = (
@@ -120,8 +197,8 @@ def generate_llm_explanation(job_description, obj, obj_type):
         "Your Explanation:"
     )
 
-    # Make the LLM call
-    result = llm.invoke(prompt)
+    # Make the LLM call (bulk priority: /ask traffic is admitted first)
+    result = await llm_gateway.ainvoke(prompt, priority=BULK)
     return result.content.strip()
 
 
@@ -134,23 +211,45 @@ async def ask_ai(request: AskRequest, token_data=Depends(verify_token)):
         raise HTTPException(status_code=422, detail="Question cannot be empty")
 
     retriever_names = request.sources or list(RETRIEVERS.keys())
-    retrievers = get_retrievers(retriever_names)
-
+    retrievers = get_resilient_retrievers(retriever_names)
+
+    # Query all retrievers concurrently; a failing or slow backend is skipped
+    # (and reported) instead of failing the whole request
+    filters = request.filters.model_dump(exclude_none=True) if request.filters else {}
+    outcomes = await asyncio.gather(
+        *(
+            retriever.aretrieve(request.question, filters=filters)
+            for retriever in retrievers
+        ),
+        return_exceptions=True,
+    )
     all_results = []
-    for retriever in retrievers:
-        all_results.extend(retriever.retrieve(request.question))
+    skipped_sources = []
+    for retriever, outcome in zip(retrievers, outcomes):
+        if isinstance(outcome, RetrievalRequestError):
+            # The request itself is bad; skipping sources would hide that
+            raise HTTPException(status_code=422, detail=str(outcome))
+        if isinstance(outcome, Exception):
+            print(f"WARNING: skipping retriever '{retriever.name}': {outcome}")
+            skipped_sources.append(retriever.name)
+        else:
+            all_results.extend(outcome)
 
     if not all_results:
-        return AskResponse(answer="No relevant information found.", sources=[])
+        return AskResponse(
+            answer="No relevant information found.",
+            sources=[],
+            skipped_sources=skipped_sources,
+        )
 
     # Synthesize answer with LLM using context
     context = "\n".join([doc["snippet"] for doc in all_results])
     prompt = f"Context:\n{context}\n\nQuestion: {request.question}"
-    result = llm.invoke(prompt)
+    result = await llm_gateway.ainvoke(prompt, priority=INTERACTIVE)
     answer = result.content.strip()
 
     sources = [SourceAttribution(**doc) for doc in all_results]
-    return AskResponse(answer=answer, sources=sources)
+    return AskResponse(answer=answer, sources=sources, skipped_sources=skipped_sources)
 
 
 # --- Resume Source-of-Truth Endpoint ---
@@ -162,6 +261,10 @@ except Exception as e:
     print(f"Could not load {SOURCE_OF_TRUTH_PATH}: {e}")
     source_data = None
 
+# Precomputed match features for /job/intake (see app/scoring.py)
+scoring_engine = ScoringEngine(source_data) if source_data else None
+INTAKE_TOP_N = int(os.getenv("INTAKE_TOP_N", "5"))
+
 
 @app.get("/resume/source", response_model=SourceOfTruth)
 def get_source_of_truth():
@@ -174,98 +277,21 @@ def get_source_of_truth():
 
 
 @app.post("/job/intake")
-async def job_intake(job_description: str = Body(..., embed=True)):
-    matches = []
-    seen = set()
-
-    # Skills
-    for skill in source_data.skills:
-        if skill.name.lower() in job_description.lower() and skill.name not in seen:
-            seen.add(skill.name)
-            evidence = []
-            for evid in skill.evidence:
-                exp = next((e for e in source_data.experiences if e.id == evid), None)
-                proj = next((p for p in source_data.projects if p.id == evid), None)
-                if exp:
-                    evidence.append(
-                        {
-                            "type": "experience",
-                            "title": exp.title,
-                            "employer": exp.employer,
-                            "links": getattr(exp, "links", []),
-                        }
-                    )
-                elif proj:
-                    evidence.append(
-                        {
-                            "type": "project",
-                            "name": proj.name,
-                            "links": getattr(proj, "links", []),
-                        }
-                    )
-            match = {
-                "type": "skill",
-                "name": skill.name,
-                "reason": (f"Matched because '{skill.name}' found in job description"),
-                "evidence": evidence,
-                "score": 2 + len(evidence),
-            }
-            # --- Add LLM explanation here ---
-            match["llm_explanation"] = generate_llm_explanation(
-                job_description, match, match["type"]
-            )
-            matches.append(match)
-
-    # Experiences
-    for exp in source_data.experiences:
-        for skill in exp.skills:
-            if skill.lower() in job_description.lower() and exp.title not in seen:
-                seen.add(exp.title)
-                year = int(exp.end_date.split("-")[0])
-                recent = (datetime.now().year - year) < 3
-                match = {
-                    "type": "experience",
-                    "title": exp.title,
-                    "employer": exp.employer,
-                    "reason": (
-                        f"Matched because required skill '{skill}' found in job "
-                        "description"
-                    ),
-                    "outcomes": exp.outcomes,
-                    "links": getattr(exp, "links", []),
-                    "recent": recent,
-                    "score": 3 if recent else 2,
-                }
-                match["llm_explanation"] = generate_llm_explanation(
-                    job_description, match, match["type"]
-                )
-                matches.append(match)
-                break
-
-    # Projects
-    for proj in source_data.projects:
-        tech_hit = any(
-            tech.lower() in job_description.lower() for tech in proj.tech_stack
-        )
-        if tech_hit and proj.name not in seen:
-            seen.add(proj.name)
-            match = {
-                "type": "project",
-                "name": proj.name,
-                "reason": (
-                    "Matched because project uses tech stack "
-                    f"{proj.tech_stack} found in job description"
-                ),
-                "summary": proj.summary,
-                "links": getattr(proj, "links", []),
-                "score": 2,
-            }
-            match["llm_explanation"] = generate_llm_explanation(
-                job_description, match, match["type"]
-            )
-            matches.append(match)
+async def job_intake(
+    job_description: str = Body(..., embed=True),
+    top_n: int = Body(INTAKE_TOP_N, embed=True, ge=1),
+):
+    if scoring_engine is None:
+        raise HTTPException(status_code=500, detail="Source of truth not loaded")
+
+    # Score every entity at once; only the top N become matches/LLM calls
+    matches = scoring_engine.top_matches(job_description, top_n)
 
-    # Sort matches by score (descending)
-    matches = sorted(matches, key=lambda m: m["score"], reverse=True)
+    # --- Add LLM explanations (concurrently, through the gateway) ---
+    explanations = await asyncio.gather(
+        *(generate_llm_explanation(job_description, m, m["type"]) for m in matches)
+    )
+    for match, explanation in zip(matches, explanations):
+        match["llm_explanation"] = explanation
 
     return {"matches": matches, "job_description": job_description}
@@ -0,0 +1,157 @@
+# app/profiling.py
+
+# Opt-in, low-overhead profiling of live requests.
+#
+# A request is profiled when it is picked by PROFILE_SAMPLE_RATE (0.0-1.0), or
+# carries `X-Profile: 1` together with credentials the app's `authorize`
+# callback accepts (a valid bearer token in app/main.py); anonymous callers
+# can't force profiling. While it runs, a background thread samples
+# the stacks of all threads every PROFILE_INTERVAL_SECONDS (so work pushed to
+# threadpools, e.g. retrievers, shows up too). Stacks are stored in "collapsed"
+# format (`frame;frame;frame count`), which flamegraph.pl, speedscope and
+# inferno read directly.
+#
+# Only one request is profiled at a time so overhead stays bounded; samples
+# can include other requests running concurrently on the same threads.
+# Finished profiles go into a ring buffer of PROFILE_BUFFER_SIZE entries and
+# are served by the /admin/profiles endpoints in app/main.py.
+
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from starlette.datastructures import Headers, MutableHeaders
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.005"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+
+
+@dataclass
+class ProfileRecord:
+    id: str
+    method: str
+    path: str
+    started_at: str
+    duration_ms: float = 0.0
+    status_code: int = 0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "status_code": self.status_code,
+            "samples": self.samples,
+        }
+
+    def collapsed(self) -> str:
+        """Flamegraph-compatible collapsed stacks, one `stack count` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+PROFILES = deque(maxlen=PROFILE_BUFFER_SIZE)
+_profile_slot = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename})".replace(";", ":")
+
+
+class StackSampler(threading.Thread):
+    """Samples every thread's stack into collapsed-stack counts."""
+
+    def __init__(self, record: ProfileRecord, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.record = record
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while True:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                self.record.stacks[";".join(reversed(labels))] += 1
+            self.record.samples += 1
+            if self._stop_event.wait(self.interval):
+                break
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def should_profile(headers, authorize=None) -> bool:
+    forced = headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+    if forced and authorize is not None and authorize(headers):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class ProfileMiddleware:
+    """ASGI middleware: profile opted-in/sampled requests into PROFILES.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so requests that aren't
+    selected go straight to the app: no extra task or wrapped response stream.
+    `authorize(headers) -> bool` decides who may force a profile via X-Profile.
+    """
+
+    def __init__(self, app, authorize=None):
+        self.app = app
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        profile = should_profile(Headers(scope=scope), self.authorize)
+        if not profile or not _profile_slot.acquire(False):
+            return await self.app(scope, receive, send)
+
+        record = ProfileRecord(
+            id=uuid.uuid4().hex[:12],
+            method=scope["method"],
+            path=scope["path"],
+            started_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                record.status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", record.id)
+            await send(message)
+
+        sampler = StackSampler(record, PROFILE_INTERVAL_SECONDS)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            _profile_slot.release()
+            record.duration_ms = round(1000 * (time.perf_counter() - start), 2)
+            PROFILES.append(record)
+
+
+def get_profile(profile_id: str):
+    return next((p for p in PROFILES if p.id == profile_id), None)
@@ -1,6 +1,8 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from app.retrievers.filters import parse_filter_date
 
 
 class SourceAttribution(BaseModel):
@@ -11,14 +13,32 @@ class SourceAttribution(BaseModel):
     url: Optional[str] = None
 
 
+class RetrievalFilters(BaseModel):
+    doc_type: Optional[str] = None  # resume, letter, portfolio, reference
+    source_file: Optional[str] = None  # e.g. "fastapi.txt"
+    tags: Optional[List[str]] = None  # all listed tags must match
+    date_from: Optional[str] = None  # "YYYY-MM" or "YYYY"
+    date_to: Optional[str] = None  # "YYYY-MM" or "YYYY"
+
+    @field_validator("date_from", "date_to")
+    @classmethod
+    def check_date(cls, value):
+        # Reject bad dates with a 422 here rather than inside the retrievers
+        if value is not None:
+            parse_filter_date(value)
+        return value
+
+
 class AskRequest(BaseModel):
     question: str
     sources: Optional[List[str]] = None  # If not provided, use all retrievers
+    filters: Optional[RetrievalFilters] = None  # Pushed down into each retriever
 
 
 class AskResponse(BaseModel):
     answer: str
     sources: List[SourceAttribution]
+    skipped_sources: List[str] = []  # Retrievers that failed, timed out or are open
 
 
 # Optionally, keep legacy models for backwards compatibility:
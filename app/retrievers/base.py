@@ -3,11 +3,16 @@
 from abc import ABC, abstractmethod
 
 
+class RetrievalRequestError(ValueError):
+    """The caller's query/filters are invalid (not a backend failure)."""
+
+
 class Retriever(ABC):
     @abstractmethod
     def retrieve(self, query: str, **kwargs) -> list:
         """
         Retrieve documents/snippets relevant to a query.
+        kwargs may include `filters` (dict, see filters.py) to narrow the search.
         Returns: List of dicts with at least:
           - type (e.g., "faiss", "chroma")
           - id (optional, for attribution)
@@ -16,3 +21,6 @@ class Retriever(ABC):
           - url (optional)
         """
         pass
+
+    def refresh(self):
+        """Re-read index state that ingestion may have changed (default: no-op)."""
@@ -2,38 +2,107 @@
 
 # Import your Chroma client—this is an example using chromadb
 # Adjust the import/init as needed for your actual setup.
+import os
+import time
+
 import chromadb
 
+from app.embeddings import EMBEDDING_PROVIDER, get_embeddings
+
 from .base import Retriever
+from .filters import COLLECTION_PREFIX, build_chroma_where, collection_name
+
+# How often to re-list collections, so ones created by a later ingestion run
+# are searched without a restart (the sidecar's invalidate op refreshes now)
+CHROMA_COLLECTION_REFRESH_SECONDS = float(
+    os.getenv("CHROMA_COLLECTION_REFRESH_SECONDS", "30")
+)
 
 
 class ChromaRetriever(Retriever):
-    def __init__(self):
+    def __init__(
+        self,
+        path: str = "./app/chroma_db/",
+        refresh_seconds: float = CHROMA_COLLECTION_REFRESH_SECONDS,
+    ):
         # Connect to Chroma (example: local DB)
-        self.client = chromadb.PersistentClient(path="./app/chroma_db/")
-        self.collection = self.client.get_or_create_collection("default")
-
-    def retrieve(self, query: str, **kwargs) -> list:
-        # Chroma query (simplified demo—update for your schema)
-        results = self.collection.query(query_texts=[query], n_results=3)
-        # Assume results["documents"], results["ids"], results["metadatas"]
-        docs = []
-        for i, doc_text in enumerate(results["documents"][0]):
-            docs.append(
-                {
-                    "type": "chroma",
-                    "id": results["ids"][0][i] if results["ids"] else None,
-                    "title": (
-                        results["metadatas"][0][i].get("title", "")
-                        if results.get("metadatas")
-                        else ""
-                    ),
-                    "snippet": doc_text,
-                    "url": (
-                        results["metadatas"][0][i].get("url", "")
-                        if results.get("metadatas")
-                        else ""
-                    ),
-                }
+        self.client = chromadb.PersistentClient(path=path)
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.collections = {}
+        self.refresh()
+
+    def refresh(self):
+        # Ingestion writes one collection per doc type (docs_resume, ...);
+        # fall back to the legacy single "default" collection
+        collections = {
+            c.name: c
+            for c in self.client.list_collections()
+            if c.name.startswith(COLLECTION_PREFIX)
+        }
+        for name, collection in collections.items():
+            if name in self.collections:
+                continue
+            # Vectors are only comparable with the provider that indexed them
+            indexed_with = (collection.metadata or {}).get("embedding_provider")
+            if indexed_with and indexed_with != EMBEDDING_PROVIDER:
+                print(
+                    f"WARNING: Chroma collection '{name}' was indexed "
+                    f"with '{indexed_with}' embeddings but "
+                    f"EMBEDDING_PROVIDER='{EMBEDDING_PROVIDER}'"
+                )
+        if not collections:
+            if "default" not in self.collections:
+                print(
+                    f"WARNING: no '{COLLECTION_PREFIX}*' collections in {self.path}; "
+                    "searching the legacy 'default' collection until ingestion runs"
+                )
+            collections = {"default": self.client.get_or_create_collection("default")}
+        self.collections = collections
+        self._refreshed_at = time.monotonic()
+
+    def _target_collections(self, filters: dict):
+        if time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.refresh()
+        collections = self.collections
+        doc_type = filters.get("doc_type")
+        if doc_type and collection_name(doc_type) in collections:
+            return [collections[collection_name(doc_type)]]
+        if doc_type and "default" not in collections:
+            return []  # no collection holds that doc type
+        return list(collections.values())
+
+    def retrieve(self, query: str, filters: dict = None, **kwargs) -> list:
+        filters = filters or {}
+        collections = self._target_collections(filters)
+        if not collections:
+            return []
+        # Embed with the configured provider (local = no network round-trip)
+        query_embedding = get_embeddings().embed_query(query)
+        where = build_chroma_where(filters)
+
+        hits = []
+        for collection in collections:
+            results = collection.query(
+                query_embeddings=[query_embedding], n_results=3, where=where
             )
-        return docs
+            metadatas = (results.get("metadatas") or [[]])[0]
+            distances = (results.get("distances") or [[]])[0]
+            for i, doc_text in enumerate(results["documents"][0]):
+                metadata = metadatas[i] if i < len(metadatas) else {}
+                metadata = metadata or {}
+                hits.append(
+                    (
+                        distances[i] if i < len(distances) else 0.0,
+                        {
+                            "type": "chroma",
+                            "id": results["ids"][0][i] if results["ids"] else None,
+                            "title": metadata.get("title", ""),
+                            "snippet": doc_text,
+                            "url": metadata.get("url", ""),
+                        },
+                    )
+                )
+        # Merge per-collection results by distance
+        hits.sort(key=lambda hit: hit[0])
+        return [doc for _, doc in hits[:3]]
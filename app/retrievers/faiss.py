@@ -1,6 +1,7 @@
 # app/retrievers/faiss.py
 
 from .base import Retriever
+from .filters import matches_filters
 
 
 class FAISSRetriever(Retriever):
@@ -8,9 +9,13 @@ class FAISSRetriever(Retriever):
         # load FAISS index here if needed
         pass
 
-    def retrieve(self, query: str, **kwargs) -> list:
-        # Replace with your FAISS search logic
+    def retrieve(self, query: str, filters: dict = None, **kwargs) -> list:
+        # Replace with your FAISS search logic (pass a filter callable built
+        # from matches_filters to similarity_search, see vectorstore_FAISS.py)
         # Return list of dicts as specified in base.py
+        metadata = {"doc_type": "reference", "source_file": "vectorstores.txt"}
+        if not matches_filters(metadata, filters):
+            return []
         return [
             {
                 "type": "faiss",
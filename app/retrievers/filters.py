@@ -0,0 +1,143 @@
+# app/retrievers/filters.py
+
+# Retrieval-time metadata filters.
+#
+# Ingestion tags every chunk with document_metadata(); /ask filters are then
+# pushed down into Chroma `where` clauses (build_chroma_where) or applied to
+# in-process indexes (matches_filters), so each query searches only the
+# targeted subset of the corpus.
+#
+# Chunk metadata written at ingestion:
+#   doc_type     "resume" | "letter" | "portfolio" | "reference"
+#   source_file  file name, e.g. "fastapi.txt"
+#   doc_date     int YYYYMM (from the date in the file name, else file mtime)
+#   tags         comma-joined tags, for display
+#   tag_<name>   True for each tag (Chroma metadata can't hold lists)
+
+import os
+import re
+from datetime import datetime
+
+from .base import RetrievalRequestError
+
+COLLECTION_PREFIX = "docs_"
+DOC_TYPES = ("resume", "letter", "portfolio", "reference")
+
+# Tags detected from file names (keyword in lower-cased name -> tag)
+KEYWORD_TAGS = {
+    "sdet": "sdet",
+    "automation": "automation",
+    "llm": "llm",
+    "agentic": "ai",
+    "langchain": "langchain",
+    "fastapi": "fastapi",
+    "vector": "vectorstores",
+    "_po_": "product-owner",
+    "programmer_writer": "technical-writing",
+    "sci_math_tech": "science",
+}
+
+_DATE_IN_NAME = re.compile(r"(?<!\d)(\d{8}|\d{6})(?!\d)")
+_FILTER_DATE = re.compile(r"^\d{4}(-\d{2})?$")
+
+
+def collection_name(doc_type: str) -> str:
+    return f"{COLLECTION_PREFIX}{doc_type}"
+
+
+def classify_doc_type(filename: str) -> str:
+    name = filename.lower()
+    for doc_type in ("resume", "letter", "portfolio"):
+        if doc_type in name:
+            return doc_type
+    return "reference"
+
+
+def _date_from_name(filename: str):
+    # File names carry MMDDYY or MMDDYYYY stamps, e.g. _012125 or _06162025
+    match = _DATE_IN_NAME.search(filename)
+    if not match:
+        return None
+    digits = match.group(1)
+    month = int(digits[:2])
+    year = int(digits[4:]) if len(digits) == 8 else 2000 + int(digits[4:])
+    if not 1 <= month <= 12:
+        return None
+    return year * 100 + month
+
+
+def document_metadata(path: str) -> dict:
+    """Filterable metadata for every chunk of the document at `path`."""
+    filename = os.path.basename(path)
+    doc_date = _date_from_name(filename)
+    if doc_date is None and os.path.exists(path):
+        modified = datetime.fromtimestamp(os.path.getmtime(path))
+        doc_date = modified.year * 100 + modified.month
+    name = filename.lower()
+    tags = sorted({tag for key, tag in KEYWORD_TAGS.items() if key in name})
+    metadata = {
+        "doc_type": classify_doc_type(filename),
+        "source_file": filename,
+        "title": filename,
+        "doc_date": doc_date or 0,
+        "tags": ",".join(tags),
+    }
+    metadata.update({f"tag_{tag}": True for tag in tags})
+    return metadata
+
+
+def parse_filter_date(value: str, end: bool = False) -> int:
+    """'2024-05' -> 202405; a bare year covers the whole year."""
+    if not isinstance(value, str) or not _FILTER_DATE.match(value):
+        raise RetrievalRequestError(f"Invalid date {value!r}, expected YYYY or YYYY-MM")
+    parts = value.split("-")
+    year = int(parts[0])
+    month = int(parts[1]) if len(parts) > 1 else (12 if end else 1)
+    if not 1 <= month <= 12:
+        raise RetrievalRequestError(f"Invalid month in date {value!r}")
+    return year * 100 + month
+
+
+def build_chroma_where(filters: dict):
+    """Translate /ask filters into a Chroma `where` clause (None = no filter)."""
+    filters = filters or {}
+    clauses = []
+    if filters.get("doc_type"):
+        clauses.append({"doc_type": filters["doc_type"]})
+    if filters.get("source_file"):
+        clauses.append({"source_file": filters["source_file"]})
+    for tag in filters.get("tags") or []:
+        clauses.append({f"tag_{tag.lower()}": True})
+    if filters.get("date_from"):
+        clauses.append({"doc_date": {"$gte": parse_filter_date(filters["date_from"])}})
+    if filters.get("date_to"):
+        clauses.append(
+            {"doc_date": {"$lte": parse_filter_date(filters["date_to"], end=True)}}
+        )
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def matches_filters(metadata: dict, filters: dict) -> bool:
+    """Same semantics as build_chroma_where, for in-process indexes."""
+    filters = filters or {}
+    metadata = metadata or {}
+    if filters.get("doc_type") and metadata.get("doc_type") != filters["doc_type"]:
+        return False
+    source_file = filters.get("source_file")
+    if source_file and metadata.get("source_file") != source_file:
+        return False
+    for tag in filters.get("tags") or []:
+        if not metadata.get(f"tag_{tag.lower()}"):
+            return False
+    doc_date = metadata.get("doc_date", 0)
+    if filters.get("date_from") and doc_date < parse_filter_date(filters["date_from"]):
+        return False
+    if filters.get("date_to") and doc_date > parse_filter_date(
+        filters["date_to"], end=True
+    ):
+        return False
+    return True
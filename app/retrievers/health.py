@@ -0,0 +1,202 @@
+# app/retrievers/health.py
+
+# Per-retriever health tracking for /ask:
+# - a circuit breaker per backend, so a failing/locked store is skipped fast
+#   instead of being retried on every request
+# - an overall timeout per retriever, so one slow disk can't stall the request
+# - optional hedged requests: if the primary hasn't answered within
+#   RETRIEVER_HEDGE_DELAY_SECONDS, the same query is sent to the next replica
+#   and the first successful answer wins
+# - a bulkhead per backend: its own small thread pool and in-flight cap. A
+#   timed-out call can't be cancelled (its thread keeps running), so without
+#   this a hung backend would fill the shared default executor and starve the
+#   healthy retrievers. Up to RETRIEVER_MAX_QUEUE more calls may wait for a
+#   thread; beyond that, calls fail fast.
+#
+# Only backend/infrastructure errors count against a breaker; a
+# RetrievalRequestError (invalid query/filters) propagates unchanged. Anything
+# else, including a TypeError from a backend bug, is a backend failure.
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .base import RetrievalRequestError, Retriever
+
+RETRIEVER_TIMEOUT_SECONDS = float(os.getenv("RETRIEVER_TIMEOUT_SECONDS", "5"))
+RETRIEVER_HEDGE_DELAY_SECONDS = float(
+    os.getenv("RETRIEVER_HEDGE_DELAY_SECONDS", "0.25")
+)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+RETRIEVER_MAX_CONCURRENCY = int(os.getenv("RETRIEVER_MAX_CONCURRENCY", "8"))
+RETRIEVER_MAX_QUEUE = int(os.getenv("RETRIEVER_MAX_QUEUE", "64"))
+
+
+class RetrieverUnavailable(Exception):
+    """Raised when no backend of a retriever produced results in time."""
+
+
+class BulkheadFull(Exception):
+    """Raised when a backend already has its maximum number of calls in flight."""
+
+
+class Bulkhead:
+    """Dedicated thread pool plus in-flight cap for one backend."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = RETRIEVER_MAX_CONCURRENCY,
+        max_queue: int = RETRIEVER_MAX_QUEUE,
+    ):
+        self.max_in_flight = max_concurrent + max_queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix=f"retriever-{name}"
+        )
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def _release(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                raise BulkheadFull(f"{self.in_flight} calls still in flight")
+            self.in_flight += 1
+        # Counted until the thread really finishes, not when we stop waiting;
+        # a call abandoned while still queued is cancelled and frees its slot
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        # OPEN: let one trial through after reset_timeout (HALF_OPEN). A trial
+        # that never reports back doesn't block further trials forever.
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class ResilientRetriever:
+    """A named retriever plus optional replicas, each behind a circuit breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        primary: Retriever,
+        replicas=(),
+        timeout: float = RETRIEVER_TIMEOUT_SECONDS,
+        hedge_delay: float = RETRIEVER_HEDGE_DELAY_SECONDS,
+    ):
+        self.name = name
+        self.backends = [primary, *replicas]
+        self.breakers = [CircuitBreaker() for _ in self.backends]
+        self.bulkheads = [Bulkhead(f"{name}-{i}") for i, _ in enumerate(self.backends)]
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+
+    async def _attempt(self, backend, breaker, bulkhead, query, kwargs):
+        try:
+            # Retrievers are blocking; run them in this backend's own pool
+            result = await bulkhead.run(backend.retrieve, query, **kwargs)
+        except (asyncio.CancelledError, BulkheadFull, RetrievalRequestError):
+            # Saturation is already reflected by the timeouts that caused it
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+    async def aretrieve(self, query: str, **kwargs) -> list:
+        candidates = [
+            (backend, breaker, bulkhead)
+            for backend, breaker, bulkhead in zip(
+                self.backends, self.breakers, self.bulkheads
+            )
+            if breaker.allow_request()
+        ]
+        if not candidates:
+            raise RetrieverUnavailable(f"{self.name}: circuit open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        pending = {}  # task -> breaker
+        errors = []
+
+        def launch():
+            backend, breaker, bulkhead = candidates.pop(0)
+            task = asyncio.ensure_future(
+                self._attempt(backend, breaker, bulkhead, query, kwargs)
+            )
+            pending[task] = breaker
+
+        launch()
+        timed_out = False
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                wait = min(self.hedge_delay, remaining) if candidates else remaining
+                done, _ = await asyncio.wait(
+                    pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    if isinstance(task.exception(), RetrievalRequestError):
+                        raise task.exception()  # same on every replica
+                    errors.append(task.exception())
+                # Failed, or still slow after hedge_delay: try the next replica
+                if candidates:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if timed_out:
+                # Whatever was still running at the deadline counts as a failure
+                for breaker in pending.values():
+                    breaker.record_failure()
+
+        if timed_out:
+            raise RetrieverUnavailable(f"{self.name}: timed out after {self.timeout}s")
+        raise RetrieverUnavailable(f"{self.name}: {errors[-1]!r}")
@@ -1,29 +1,42 @@
 # app/retrievers/mock.py
 
 from .base import Retriever
+from .filters import matches_filters
 
 
 class MockRetriever(Retriever):
-    def retrieve(self, query: str, **kwargs) -> list:
-        # Always return a couple of dummy results
-        return [
-            {
-                "type": "mock",
-                "id": "mock1",
-                "title": "Mock Experience: Python Automation",
-                "snippet": (
-                    f"Matched '{query}' in a mock SDET project at " "ACME Corp."
-                ),
-                "url": None,
-            },
-            {
-                "type": "mock",
-                "id": "mock2",
-                "title": "Mock Project: AI Job Match Copilot",
-                "snippet": (
-                    "Demonstrates experience with AI-powered resume "
-                    "generation and RAG search."
-                ),
-                "url": None,
-            },
+    def retrieve(self, query: str, filters: dict = None, **kwargs) -> list:
+        # Always return a couple of dummy results (narrowed by any filters)
+        docs = [
+            (
+                {
+                    "doc_type": "resume",
+                    "doc_date": 202507,
+                    "tag_sdet": True,
+                    "tag_automation": True,
+                },
+                {
+                    "type": "mock",
+                    "id": "mock1",
+                    "title": "Mock Experience: Python Automation",
+                    "snippet": (
+                        f"Matched '{query}' in a mock SDET project at " "ACME Corp."
+                    ),
+                    "url": None,
+                },
+            ),
+            (
+                {"doc_type": "portfolio", "doc_date": 202507, "tag_ai": True},
+                {
+                    "type": "mock",
+                    "id": "mock2",
+                    "title": "Mock Project: AI Job Match Copilot",
+                    "snippet": (
+                        "Demonstrates experience with AI-powered resume "
+                        "generation and RAG search."
+                    ),
+                    "url": None,
+                },
+            ),
         ]
+        return [doc for metadata, doc in docs if matches_filters(metadata, filters)]
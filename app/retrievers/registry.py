@@ -1,17 +1,66 @@
 # app/retrievers/registry.py
 
-from .chroma import ChromaRetriever
-from .faiss import FAISSRetriever
-from .mock import MockRetriever
-
-# Registry pattern: simple dict mapping names to retriever instances
-RETRIEVERS = {
-    "faiss": FAISSRetriever(),
-    "chroma": ChromaRetriever(),
-    "mock": MockRetriever(),
+import os
+
+from app.sidecar_client import shared_mode
+
+from .health import ResilientRetriever
+from .remote import RemoteRetriever
+
+RETRIEVER_NAMES = ("faiss", "chroma", "mock")
+
+# Comma-separated paths of read replicas of the Chroma DB, used for hedging
+CHROMA_REPLICA_PATHS = [
+    p for p in os.getenv("CHROMA_REPLICA_PATHS", "").split(",") if p.strip()
+]
+
+
+def build_local_retrievers():
+    """Instantiate the real retrievers (indexes, DB clients) in this process."""
+    # Imported here so thin workers in shared mode never load chromadb/FAISS
+    from .chroma import ChromaRetriever
+    from .faiss import FAISSRetriever
+    from .mock import MockRetriever
+
+    return {
+        "faiss": FAISSRetriever(),
+        "chroma": ChromaRetriever(),
+        "mock": MockRetriever(),
+    }
+
+
+def build_local_replicas():
+    """Extra backends per retriever name that /ask may hedge against."""
+    from .chroma import ChromaRetriever
+
+    return {"chroma": [ChromaRetriever(path.strip()) for path in CHROMA_REPLICA_PATHS]}
+
+
+# Registry pattern: simple dict mapping names to retriever instances.
+# With SHARED_INDEX_SOCKET set, indexes live once in the sidecar process and
+# every worker gets lightweight proxies instead of its own copy. Replicas are
+# then built and hedged inside the sidecar (app/sidecar.py), not here.
+if shared_mode():
+    RETRIEVERS = {name: RemoteRetriever(name) for name in RETRIEVER_NAMES}
+    REPLICAS = {}
+else:
+    RETRIEVERS = build_local_retrievers()
+    REPLICAS = build_local_replicas()
+
+# Health-tracked wrappers (circuit breaker, timeout, hedging) used by /ask
+RESILIENT_RETRIEVERS = {
+    name: ResilientRetriever(name, retriever, REPLICAS.get(name, []))
+    for name, retriever in RETRIEVERS.items()
 }
 
 
 def get_retrievers(names):
     """Fetch retrievers by name; return list of retriever instances"""
     return [RETRIEVERS[name] for name in names if name in RETRIEVERS]
+
+
+def get_resilient_retrievers(names):
+    """Like get_retrievers, but returns the health-tracked wrappers"""
+    return [
+        RESILIENT_RETRIEVERS[name] for name in names if name in RESILIENT_RETRIEVERS
+    ]
@@ -0,0 +1,15 @@
+# app/retrievers/remote.py
+
+from app.sidecar_client import sidecar_call
+
+from .base import Retriever
+
+
+class RemoteRetriever(Retriever):
+    """Proxy to a retriever hosted in the shared index sidecar."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def retrieve(self, query: str, **kwargs) -> list:
+        return sidecar_call("retrieve", retriever=self.name, query=query, kwargs=kwargs)
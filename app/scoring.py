@@ -0,0 +1,169 @@
+# app/scoring.py
+
+# Intake scoring engine built on the SourceOfTruth.
+#
+# Everything that doesn't depend on the job description is computed once when
+# the profile loads:
+#   - a term vocabulary (skill names, experience skills, project tech stacks)
+#   - an entity x term matrix saying which terms make each entity match
+#   - per-entity base scores from evidence counts and recency buckets
+#   - evidence lookups by id (no linear scans per request)
+# Scoring a job description is then one pass over the vocabulary plus a
+# matrix-vector product over all entities, and only the top-N matches are
+# turned into response payloads (and LLM explanations).
+
+from datetime import date
+
+import numpy as np
+
+from app.models.source_of_truth import SourceOfTruth
+
+BASE_SCORE = 2
+EVIDENCE_WEIGHT = 1  # per experience/project backing a skill
+# Years since an experience ended -> bucket; bonus per bucket
+RECENCY_BUCKET_YEARS = (3, 6)  # <3 years: recent, <6: mid, else: old
+RECENCY_BONUS = (1, 0, 0)
+
+
+def recency_bucket(end_date: str, reference_year: int) -> int:
+    """0 = recent, 1 = mid, 2 = old (end_date is "YYYY-MM")."""
+    age = reference_year - int(end_date.split("-")[0])
+    for bucket, limit in enumerate(RECENCY_BUCKET_YEARS):
+        if age < limit:
+            return bucket
+    return len(RECENCY_BUCKET_YEARS)
+
+
+class ScoringEngine:
+    def __init__(self, source: SourceOfTruth, reference_year: int = None):
+        self.source = source
+        self.reference_year = reference_year or date.today().year
+        self._experiences = {e.id: e for e in source.experiences}
+        self._projects = {p.id: p for p in source.projects}
+
+        # Entities in legacy match order: skills, experiences, projects
+        self.entities = []  # (type, model, dedup key, matching terms)
+        for skill in source.skills:
+            self.entities.append(("skill", skill, skill.name, [skill.name]))
+        for exp in source.experiences:
+            self.entities.append(("experience", exp, exp.title, exp.skills))
+        for proj in source.projects:
+            self.entities.append(("project", proj, proj.name, proj.tech_stack))
+
+        self.terms = sorted({t.lower() for *_, terms in self.entities for t in terms})
+        term_index = {term: i for i, term in enumerate(self.terms)}
+
+        n = len(self.entities)
+        self.term_matrix = np.zeros((n, len(self.terms)), dtype=np.float32)
+        self.base_scores = np.zeros(n, dtype=np.float32)
+        self.recency = np.full(n, -1, dtype=np.int8)  # -1 = not applicable
+        group_ids = {}
+        self.groups = np.zeros(n, dtype=np.int32)
+        self._evidence = {}
+
+        for i, (kind, obj, key, terms) in enumerate(self.entities):
+            for term in terms:
+                self.term_matrix[i, term_index[term.lower()]] = 1.0
+            # Matches are de-duplicated by name/title across entity types
+            self.groups[i] = group_ids.setdefault(key, len(group_ids))
+            score = BASE_SCORE
+            if kind == "skill":
+                self._evidence[i] = self._resolve_evidence(obj.evidence)
+                score += EVIDENCE_WEIGHT * len(self._evidence[i])
+            elif kind == "experience":
+                self.recency[i] = recency_bucket(obj.end_date, self.reference_year)
+                score += RECENCY_BONUS[self.recency[i]]
+            self.base_scores[i] = score
+
+    def _resolve_evidence(self, evidence_ids) -> list:
+        evidence = []
+        for evid in evidence_ids:
+            exp = self._experiences.get(evid)
+            proj = self._projects.get(evid)
+            if exp:
+                evidence.append(
+                    {
+                        "type": "experience",
+                        "title": exp.title,
+                        "employer": exp.employer,
+                        "links": getattr(exp, "links", []),
+                    }
+                )
+            elif proj:
+                evidence.append(
+                    {
+                        "type": "project",
+                        "name": proj.name,
+                        "links": getattr(proj, "links", []),
+                    }
+                )
+        return evidence
+
+    def rank(self, job_description: str, top_n: int = None):
+        """Return [(entity index, score)] for the best matches, best first."""
+        text = job_description.lower()
+        query = np.fromiter(
+            (term in text for term in self.terms),
+            dtype=np.float32,
+            count=len(self.terms),
+        )
+        hit_counts = self.term_matrix @ query
+        candidates = np.flatnonzero(hit_counts > 0)
+        # Keep the first matching entity of each name/title group
+        _, first = np.unique(self.groups[candidates], return_index=True)
+        candidates = candidates[np.sort(first)]
+        scores = self.base_scores[candidates]
+
+        # Higher score first; ties keep legacy order (lower index first)
+        keys = scores * (len(self.entities) + 1) - candidates
+        if top_n is not None and top_n < len(candidates):
+            # Early cutoff: partial selection, then sort only the top N
+            top = np.argpartition(-keys, top_n - 1)[:top_n]
+            order = top[np.argsort(-keys[top], kind="stable")]
+        else:
+            order = np.argsort(-keys, kind="stable")
+        return [(int(candidates[j]), int(scores[j])) for j in order]
+
+    def build_match(self, index: int, score: int, job_description: str) -> dict:
+        kind, obj, _, _ = self.entities[index]
+        if kind == "skill":
+            return {
+                "type": "skill",
+                "name": obj.name,
+                "reason": f"Matched because '{obj.name}' found in job description",
+                "evidence": self._evidence[index],
+                "score": score,
+            }
+        if kind == "experience":
+            text = job_description.lower()
+            skill = next(s for s in obj.skills if s.lower() in text)
+            return {
+                "type": "experience",
+                "title": obj.title,
+                "employer": obj.employer,
+                "reason": (
+                    f"Matched because required skill '{skill}' found in job "
+                    "description"
+                ),
+                "outcomes": obj.outcomes,
+                "links": getattr(obj, "links", []),
+                "recent": bool(self.recency[index] == 0),
+                "score": score,
+            }
+        return {
+            "type": "project",
+            "name": obj.name,
+            "reason": (
+                "Matched because project uses tech stack "
+                f"{obj.tech_stack} found in job description"
+            ),
+            "summary": obj.summary,
+            "links": getattr(obj, "links", []),
+            "score": score,
+        }
+
+    def top_matches(self, job_description: str, top_n: int = None) -> list:
+        return [
+            self.build_match(index, score, job_description)
+            for index, score in self.rank(job_description, top_n)
+        ]
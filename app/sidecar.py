@@ -0,0 +1,152 @@
+# app/sidecar.py
+
+# Shared index/cache sidecar for multi-worker deployments.
+#
+# One process owns the retriever registry (Chroma client, FAISS index,
+# embedding model) and a retrieval result cache. Uvicorn workers started with
+# the same SHARED_INDEX_SOCKET talk to it over a Unix socket (see
+# app/sidecar_client.py), so adding workers adds request handlers, not copies
+# of the indexes, and every worker shares one cache. Retrievers are wrapped in
+# ResilientRetriever here too, so Chroma replicas (CHROMA_REPLICA_PATHS) are
+# hedged inside the sidecar, where they actually live.
+#
+# Run:  SHARED_INDEX_SOCKET=/tmp/ai-backend-index.sock python -m app.sidecar
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+
+from app.embeddings import warm_up_embeddings
+from app.retrievers.base import RetrievalRequestError
+from app.retrievers.health import ResilientRetriever
+from app.retrievers.registry import build_local_replicas, build_local_retrievers
+from app.sidecar_client import SHARED_INDEX_SOCKET
+
+SHARED_CACHE_SIZE = int(os.getenv("SHARED_CACHE_SIZE", "2048"))
+SHARED_CACHE_TTL_SECONDS = float(os.getenv("SHARED_CACHE_TTL_SECONDS", "300"))
+
+
+class ResultCache:
+    """Small LRU + TTL for retrieval results, shared by all workers."""
+
+    def __init__(
+        self, maxsize: int = SHARED_CACHE_SIZE, ttl: float = SHARED_CACHE_TTL_SECONDS
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._data[key]  # expired
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> int:
+        """Drop everything (e.g. after re-ingestion); returns entries removed."""
+        removed = len(self._data)
+        self._data.clear()
+        return removed
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class IndexSidecar:
+    def __init__(
+        self, retrievers: dict = None, replicas: dict = None, cache: ResultCache = None
+    ):
+        if retrievers is None:
+            retrievers, replicas = build_local_retrievers(), build_local_replicas()
+        replicas = replicas or {}
+        self.retrievers = {
+            name: ResilientRetriever(name, retriever, replicas.get(name, []))
+            for name, retriever in retrievers.items()
+        }
+        self.cache = cache or ResultCache()
+
+    async def retrieve(self, retriever: str, query: str, kwargs: dict = None):
+        kwargs = kwargs or {}
+        if retriever not in self.retrievers:
+            raise KeyError(f"Unknown retriever: {retriever}")
+        key = json.dumps([retriever, query, kwargs], sort_keys=True)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        # Timeout, breaker, bulkhead and replica hedging; runs off the loop
+        result = await self.retrievers[retriever].aretrieve(query, **kwargs)
+        self.cache.put(key, result)
+        return result
+
+    def refresh_backends(self):
+        for retriever in self.retrievers.values():
+            for backend in retriever.backends:
+                backend.refresh()
+
+    async def dispatch(self, request: dict):
+        op = request.pop("op", None)
+        if op == "ping":
+            return "pong"
+        if op == "retrieve":
+            return await self.retrieve(**request)
+        if op == "invalidate":
+            # New chunks may live in new collections: re-read index state too
+            await asyncio.to_thread(self.refresh_backends)
+            return {"removed": self.cache.clear()}
+        if op == "stats":
+            return {"retrievers": list(self.retrievers), "cache": self.cache.stats()}
+        raise ValueError(f"Unknown op: {op}")
+
+    async def handle(self, reader, writer):
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                result = await self.dispatch(json.loads(line))
+                response = {"ok": True, "result": result}
+            except RetrievalRequestError as e:
+                response = {"ok": False, "error": str(e), "caller_error": True}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, path: str):
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self.handle, path=path)
+        backends = {name: len(r.backends) for name, r in self.retrievers.items()}
+        print(f"Sidecar listening on {path} with retrievers (backends) {backends}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    if not SHARED_INDEX_SOCKET:
+        raise SystemExit("Set SHARED_INDEX_SOCKET to run the index sidecar")
+    warm_up_embeddings()
+    asyncio.run(IndexSidecar().serve(SHARED_INDEX_SOCKET))
+
+
+if __name__ == "__main__":
+    main()
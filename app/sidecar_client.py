@@ -0,0 +1,70 @@
+# app/sidecar_client.py
+
+# Thin client used by API workers when SHARED_INDEX_SOCKET is set.
+# Each call opens a Unix-socket connection to the index sidecar (app/sidecar.py),
+# sends one JSON line and reads one JSON line back.
+
+import json
+import os
+import socket
+import time
+
+from dotenv import load_dotenv
+
+from app.retrievers.base import RetrievalRequestError
+
+load_dotenv()
+
+SHARED_INDEX_SOCKET = os.getenv("SHARED_INDEX_SOCKET", "")
+SIDECAR_TIMEOUT_SECONDS = float(os.getenv("SIDECAR_TIMEOUT_SECONDS", "5"))
+# Only the startup wait retries for long; request-path calls fail fast
+SIDECAR_STARTUP_RETRIES = int(os.getenv("SIDECAR_STARTUP_RETRIES", "300"))
+
+
+class SidecarError(RuntimeError):
+    """Raised when the sidecar is unreachable or returns an error."""
+
+
+def shared_mode() -> bool:
+    return bool(SHARED_INDEX_SOCKET)
+
+
+def _connect(path: str, retries: int) -> socket.socket:
+    last_error = None
+    for attempt in range(max(retries, 1)):
+        if attempt:
+            time.sleep(0.1)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(SIDECAR_TIMEOUT_SECONDS)
+        try:
+            sock.connect(path)
+            return sock
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            sock.close()
+            last_error = e
+    raise SidecarError(f"Could not connect to sidecar at {path}: {last_error}")
+
+
+def sidecar_call(op: str, connect_retries: int = 1, **params):
+    """Send one request to the sidecar and return its result."""
+    sock = _connect(SHARED_INDEX_SOCKET, connect_retries)
+    try:
+        with sock, sock.makefile("rwb") as stream:
+            stream.write(json.dumps({"op": op, **params}).encode() + b"\n")
+            stream.flush()
+            line = stream.readline()
+    except OSError as e:
+        raise SidecarError(f"Sidecar call '{op}' failed: {e}") from e
+    if not line:
+        raise SidecarError(f"Sidecar closed the connection during '{op}'")
+    response = json.loads(line)
+    if not response.get("ok"):
+        if response.get("caller_error"):
+            raise RetrievalRequestError(response["error"])
+        raise SidecarError(response.get("error", "unknown sidecar error"))
+    return response["result"]
+
+
+def wait_for_sidecar():
+    """Block until the sidecar answers (it may still be loading indexes)."""
+    return sidecar_call("ping", connect_retries=SIDECAR_STARTUP_RETRIES)
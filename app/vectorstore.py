@@ -3,9 +3,17 @@ import os
 from dotenv import load_dotenv
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from app.embeddings import embedding_metadata, get_embeddings
+from app.retrievers.filters import (
+    DOC_TYPES,
+    build_chroma_where,
+    collection_name,
+    document_metadata,
+)
+from app.sidecar_client import SidecarError, shared_mode, sidecar_call
+
 # ✅ Load .env if not loaded already
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
@@ -14,8 +22,8 @@ api_key = os.getenv("OPENAI_API_KEY")
 DOCS_PATH = "app/docs"
 VECTOR_DB_PATH = "app/chroma_db"
 
-# 🔤 Embedding model
-embeddings = OpenAIEmbeddings()
+# 🔤 Embedding model (EMBEDDING_PROVIDER=openai|local)
+embeddings = get_embeddings()
 
 
 # 📄 Load and split documents
@@ -31,25 +39,62 @@ def load_documents():
         else:
             continue
 
-        docs.extend(loader.load())
+        # 🏷️ Filterable metadata (doc_type, source_file, doc_date, tags)
+        metadata = document_metadata(full_path)
+        for doc in loader.load():
+            doc.metadata.update(metadata)
+            docs.append(doc)
     return docs
 
 
 # ✂️ Split text into chunks
 def split_documents(docs):
     splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    return splitter.split_documents(docs)
+    chunks = splitter.split_documents(docs)
+    # 🏷️ Record which embedding provider/model produced each vector
+    for chunk in chunks:
+        chunk.metadata.update(embedding_metadata())
+    return chunks
 
 
 # 📥 Load and store in Chroma
 documents = load_documents()
 chunks = split_documents(documents)
 
-vectorstore = Chroma.from_documents(
-    chunks, embeddings, persist_directory=VECTOR_DB_PATH
-)
+# One collection per doc type (docs_resume, docs_reference, ...), so a
+# doc_type filter searches only that subset
+vectorstores = {}
+for doc_type in DOC_TYPES:
+    typed_chunks = [c for c in chunks if c.metadata["doc_type"] == doc_type]
+    if not typed_chunks:
+        continue
+    vectorstores[doc_type] = Chroma.from_documents(
+        typed_chunks,
+        embeddings,
+        collection_name=collection_name(doc_type),
+        persist_directory=VECTOR_DB_PATH,
+        collection_metadata=embedding_metadata(),
+    )
+
+# ♻️ Drop cached retrievals from the shared sidecar so new chunks are served
+if shared_mode():
+    try:
+        sidecar_call("invalidate")
+    except SidecarError as e:
+        print(f"WARNING: could not invalidate sidecar cache: {e}")
 
 
 # 🔍 Vector search returns full Document objects
-def vector_search(query):
-    return vectorstore.similarity_search(query, k=3)
+def vector_search(query, filters=None):
+    filters = filters or {}
+    stores = [
+        store
+        for doc_type, store in vectorstores.items()
+        if filters.get("doc_type") in (None, doc_type)
+    ]
+    where = build_chroma_where(filters)
+    hits = []
+    for store in stores:
+        hits.extend(store.similarity_search_with_score(query, k=3, filter=where))
+    hits.sort(key=lambda hit: hit[1])
+    return [doc for doc, _ in hits[:3]]
@@ -5,29 +5,39 @@ import os
 from dotenv import load_dotenv
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from app.embeddings import embedding_metadata, get_embeddings
+from app.retrievers.filters import document_metadata, matches_filters
+
 # ✅ Load environment (if not already loaded elsewhere)
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
-# ✅ Initialize OpenAI embedding model
-embeddings = OpenAIEmbeddings(openai_api_key=api_key)
+# ✅ Initialize embedding model (EMBEDDING_PROVIDER=openai|local)
+embeddings = get_embeddings()
 
 # ✅ Load all .txt files from docs folder
 loader = DirectoryLoader("app/docs", glob="**/*.txt", loader_cls=TextLoader)
 raw_docs = loader.load()
+for raw_doc in raw_docs:
+    raw_doc.metadata.update(document_metadata(raw_doc.metadata["source"]))
 
 # ✅ Split documents into manageable chunks
 splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
 docs = splitter.split_documents(raw_docs)
+for doc in docs:
+    doc.metadata.update(embedding_metadata())
 
 # ✅ Create or reuse a FAISS vector store
+# (each chunk's metadata carries embedding_provider/embedding_model)
 db = FAISS.from_documents(docs, embeddings)
 
 
 # ✅ Simple vector search function
-def vector_search(query: str) -> list[str]:
-    results = db.similarity_search(query, k=3)
+def vector_search(query: str, filters: dict = None) -> list[str]:
+    # FAISS filters in-process: only chunks matching the metadata filters count
+    results = db.similarity_search(
+        query, k=3, filter=lambda metadata: matches_filters(metadata, filters)
+    )
     return [doc.page_content for doc in results]
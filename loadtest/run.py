@@ -0,0 +1,288 @@
+# loadtest/run.py
+
+# Load harness for /ask and /job/intake.
+#
+# By default it starts the LLM stub (loadtest/stub_llm.py) on a local port,
+# points the app's OpenAI clients at it, imports the real FastAPI app and
+# drives it in-process, so the event-loop lag it measures is the app's own.
+# Pass --url to drive an already running server instead (lag is then the
+# client's loop only).
+#
+# The run exits non-zero if the numbers don't describe the full service: any
+# /ask response reported skipped_sources, or (in-process) vector retrievers
+# were queried but the stub never served an embeddings call.
+#
+#   python -m loadtest.run --concurrency 100 --requests 2000 --endpoint mix
+#   python -m loadtest.run --concurrency 200 --duration 30 --latency-ms 800 \
+#       --rate-limit-rate 0.05 --sources mock
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+import httpx
+
+from loadtest.stub_llm import StubConfig, create_stub_app
+
+QUESTIONS = [
+    "What is vector search?",
+    "Show my Python automation experience.",
+    "Which projects used FastAPI?",
+    "Summarize my QA leadership.",
+]
+VECTOR_SOURCES = {"chroma", "faiss"}
+JOB_DESCRIPTIONS = [
+    "Senior SDET with Python, Selenium and CI/CD experience.",
+    "Product owner for a React and FastAPI platform, Scrum background.",
+    "QA automation engineer, cloud, ServiceNow integrations.",
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; returns 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def start_stub(config: StubConfig, port: int):
+    """Run the stub server in a daemon thread; returns the uvicorn Server."""
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_stub_app(config), host="127.0.0.1", port=port, log_level="warning"
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("LLM stub did not start")
+        time.sleep(0.05)
+    return server
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up from a fixed-interval sleep."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(loop.time() - start - self.interval, 0.0))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def build_request(endpoint: str, sources):
+    if endpoint == "mix":
+        endpoint = random.choice(["ask", "intake"])
+    if endpoint == "ask":
+        payload = {"question": random.choice(QUESTIONS)}
+        if sources:
+            payload["sources"] = sources
+        return "ask", "/ask", payload
+    return "intake", "/job/intake", {"job_description": random.choice(JOB_DESCRIPTIONS)}
+
+
+async def run_load(client: httpx.AsyncClient, args) -> dict:
+    token_resp = await client.post(
+        "/token", data={"username": args.user, "password": args.password}
+    )
+    token_resp.raise_for_status()
+    headers = {"Authorization": f"Bearer {token_resp.json()['access_token']}"}
+
+    latencies = {"ask": [], "intake": []}
+    statuses = Counter()
+    skipped = Counter()
+    remaining = [args.requests]
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    def take_ticket():
+        if deadline is not None:
+            return time.perf_counter() < deadline
+        if remaining[0] <= 0:
+            return False
+        remaining[0] -= 1
+        return True
+
+    async def user():
+        while take_ticket():
+            kind, path, payload = build_request(args.endpoint, args.sources)
+            start = time.perf_counter()
+            try:
+                resp = await client.post(
+                    path, json=payload, headers=headers, timeout=args.timeout
+                )
+                statuses[resp.status_code] += 1
+                if kind == "ask" and resp.status_code == 200:
+                    skipped.update(resp.json().get("skipped_sources", []))
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies[kind].append(time.perf_counter() - start)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    total = sum(len(v) for v in latencies.values())
+    report = {
+        "concurrency": args.concurrency,
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "skipped_sources": dict(skipped),
+        "latency_ms": {},
+        "loop_lag_ms": {
+            "p50": round(1000 * percentile(monitor.samples, 50), 2),
+            "p99": round(1000 * percentile(monitor.samples, 99), 2),
+            "max": round(1000 * max(monitor.samples, default=0.0), 2),
+        },
+    }
+    for kind, values in latencies.items():
+        if values:
+            report["latency_ms"][kind] = {
+                f"p{p}": round(1000 * percentile(values, p), 1) for p in (50, 90, 99)
+            }
+            report["latency_ms"][kind]["max"] = round(1000 * max(values), 1)
+    return report
+
+
+def uses_vector_sources(args) -> bool:
+    if args.endpoint == "intake":
+        return False
+    return not args.sources or bool(VECTOR_SOURCES & set(args.sources))
+
+
+def check_report(report: dict, args) -> list:
+    """Reasons the run doesn't measure the full service (empty = trustworthy)."""
+    problems = []
+    for name, count in sorted(report["skipped_sources"].items()):
+        problems.append(f"retriever '{name}' was skipped in {count} /ask responses")
+    stub_calls = report.get("stub_calls")
+    if stub_calls is not None and uses_vector_sources(args):
+        if not stub_calls.get("embeddings"):
+            problems.append("vector retrievers never called the embeddings stub")
+    return problems
+
+
+async def run_in_process(args) -> dict:
+    # Must be set before app.main builds its ChatOpenAI/OpenAIEmbeddings clients
+    base_url = f"http://127.0.0.1:{args.stub_port}/v1"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_BASE"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest-stub")
+    # Embed through the stub only: no tiktoken tokenizer download
+    os.environ["OPENAI_EMBEDDING_TOKENIZE"] = "false"
+    os.environ["EMBEDDING_PROVIDER"] = "openai"
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://app", limits=limits
+        ) as client:
+            return await run_load(client, args)
+
+
+async def run_remote(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+        return await run_load(client, args)
+
+
+def print_report(report: dict):
+    print(
+        f"\n{report['requests']} requests @ concurrency {report['concurrency']} "
+        f"in {report['elapsed_s']}s -> {report['throughput_rps']} req/s"
+    )
+    print(f"statuses: {report['statuses']}")
+    for kind, stats in report["latency_ms"].items():
+        print(
+            f"{kind:>7} latency ms: " + "  ".join(f"{k}={v}" for k, v in stats.items())
+        )
+    lag = report["loop_lag_ms"]
+    print(f"event-loop lag ms: p50={lag['p50']}  p99={lag['p99']}  max={lag['max']}")
+    if "stub_calls" in report:
+        print(f"stub calls: {report['stub_calls']}")
+    for problem in report["problems"]:
+        print(f"WARNING: {problem}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /ask and /job/intake")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--duration", type=float, help="seconds; overrides --requests")
+    parser.add_argument("--endpoint", choices=["ask", "intake", "mix"], default="mix")
+    parser.add_argument("--sources", type=lambda s: s.split(","), help="e.g. mock")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--url", help="drive a running server instead of in-process")
+    parser.add_argument("--user", default=os.getenv("DEMO_USER", "demo"))
+    parser.add_argument("--password", default=os.getenv("DEMO_PASS", "test123"))
+    parser.add_argument("--json", dest="json_path", help="also write report here")
+    stub = parser.add_argument_group("LLM stub (in-process mode)")
+    stub.add_argument("--stub-port", type=int, default=8100)
+    stub.add_argument("--latency-ms", type=float, default=StubConfig.latency_ms)
+    stub.add_argument("--tokens-per-sec", type=float, default=StubConfig.tokens_per_sec)
+    stub.add_argument("--error-rate", type=float, default=StubConfig.error_rate)
+    stub.add_argument(
+        "--rate-limit-rate", type=float, default=StubConfig.rate_limit_rate
+    )
+    args = parser.parse_args()
+
+    if args.url:
+        report = asyncio.run(run_remote(args))
+    else:
+        config = StubConfig(
+            latency_ms=args.latency_ms,
+            tokens_per_sec=args.tokens_per_sec,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+        )
+        server = start_stub(config, args.stub_port)
+        try:
+            report = asyncio.run(run_in_process(args))
+            report["stub_calls"] = dict(server.config.app.state.calls)
+        finally:
+            server.should_exit = True
+
+    report["problems"] = check_report(report, args)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["problems"]:
+        raise SystemExit("Load test ran against a degraded service; see warnings")
+
+
+if __name__ == "__main__":
+    main()
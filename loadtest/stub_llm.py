@@ -0,0 +1,175 @@
+# loadtest/stub_llm.py
+
+# Local stand-in for the OpenAI chat-completions and embeddings API.
+# Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8100/v1 to load test
+# without spending tokens. Latency, token rate and error injection are
+# configurable through StubConfig (or the env vars read by StubConfig.from_env).
+#
+# Run standalone:  python -m loadtest.stub_llm --port 8100 --latency-ms 300
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+EMBEDDING_DIM = 1536
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 200.0  # time to first token
+    jitter_ms: float = 50.0  # +/- uniform jitter on latency
+    tokens_per_sec: float = 50.0  # generation speed (0 = instant)
+    completion_tokens: int = 60  # tokens "generated" per chat completion
+    embedding_latency_ms: float = 20.0
+    error_rate: float = 0.0  # fraction of requests answered with HTTP 500
+    rate_limit_rate: float = 0.0  # fraction answered with HTTP 429
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency_ms=float(os.getenv("STUB_LATENCY_MS", cls.latency_ms)),
+            jitter_ms=float(os.getenv("STUB_JITTER_MS", cls.jitter_ms)),
+            tokens_per_sec=float(os.getenv("STUB_TOKENS_PER_SEC", cls.tokens_per_sec)),
+            completion_tokens=int(
+                os.getenv("STUB_COMPLETION_TOKENS", cls.completion_tokens)
+            ),
+            embedding_latency_ms=float(
+                os.getenv("STUB_EMBEDDING_LATENCY_MS", cls.embedding_latency_ms)
+            ),
+            error_rate=float(os.getenv("STUB_ERROR_RATE", cls.error_rate)),
+            rate_limit_rate=float(
+                os.getenv("STUB_RATE_LIMIT_RATE", cls.rate_limit_rate)
+            ),
+        )
+
+
+def _injected_error(config: StubConfig):
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": "1"},
+            content={
+                "error": {
+                    "message": "Rate limit reached (stub)",
+                    "type": "requests",
+                    "code": "rate_limit_exceeded",
+                }
+            },
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Injected failure (stub)", "type": "server"}},
+        )
+    return None
+
+
+def _fake_embedding(text: str) -> list[float]:
+    # Deterministic per text so repeated queries behave like a real index
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+    rng = random.Random(seed)
+    return [rng.uniform(-1.0, 1.0) for _ in range(EMBEDDING_DIM)]
+
+
+def create_stub_app(config: StubConfig = None) -> FastAPI:
+    config = config or StubConfig.from_env()
+    stub = FastAPI(title="LLM stub")
+    stub.state.config = config
+    stub.state.calls = {"chat": 0, "embeddings": 0}
+
+    @stub.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stub.state.calls["chat"] += 1
+        error = _injected_error(config)
+        delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+        if config.tokens_per_sec > 0:
+            delay += 1000 * config.completion_tokens / config.tokens_per_sec
+        await asyncio.sleep(max(delay, 0) / 1000)
+        if error is not None:
+            return error
+        prompt = body["messages"][-1].get("content", "")
+        prompt_tokens = max(len(str(prompt)) // 4, 1)
+        return {
+            "id": f"chatcmpl-stub-{stub.state.calls['chat']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": "stub " * config.completion_tokens,
+                    },
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": config.completion_tokens,
+                "total_tokens": prompt_tokens + config.completion_tokens,
+            },
+        }
+
+    @stub.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        stub.state.calls["embeddings"] += 1
+        error = _injected_error(config)
+        await asyncio.sleep(config.embedding_latency_ms / 1000)
+        if error is not None:
+            return error
+        inputs = body["input"]
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        return {
+            "object": "list",
+            "model": body.get("model", "stub"),
+            "data": [
+                {
+                    "object": "embedding",
+                    "index": i,
+                    "embedding": _fake_embedding(str(t)),
+                }
+                for i, t in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+        }
+
+    @stub.get("/stats")
+    async def stats():
+        return stub.state.calls
+
+    return stub
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the local LLM stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--tokens-per-sec", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--rate-limit-rate", type=float)
+    args = parser.parse_args()
+
+    config = StubConfig.from_env()
+    for field in ("latency_ms", "tokens_per_sec", "error_rate", "rate_limit_rate"):
+        if getattr(args, field) is not None:
+            setattr(config, field, getattr(args, field))
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
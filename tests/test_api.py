@@ -17,6 +17,16 @@ def client():
 DEMO_USER = os.environ.get("DEMO_USER", "demo")
 DEMO_PASS = os.environ.get("DEMO_PASS", "test123")  # Adjust to match .env
 
+# --------- Health Tests ---------
+
+
+def test_health(client):
+    """Test /health reports ready (per-worker indexes, no sidecar needed)"""
+    resp = client.get("/health")
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ok"}
+
+
 # --------- Auth Tests ---------
 
 
@@ -111,6 +121,103 @@ def test_ask_multi_retriever(client):
     assert len(data["sources"]) > 0
 
 
+class BrokenRetriever:
+    name = "broken"
+
+    async def aretrieve(self, query, **kwargs):
+        raise RuntimeError("database is locked")
+
+
+class FakeGateway:
+    async def ainvoke(self, prompt, priority=None):
+        return type("Reply", (), {"content": "stub answer"})()
+
+
+def test_ask_with_filters(client, monkeypatch):
+    """Test /ask pushes metadata filters down into the retrievers"""
+    monkeypatch.setattr("app.main.llm_gateway", FakeGateway())
+    token = get_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {
+        "question": "Show my Python automation experience.",
+        "sources": ["mock"],
+        "filters": {"doc_type": "resume", "tags": ["sdet"]},
+    }
+    resp = client.post("/ask", json=payload, headers=headers)
+    assert resp.status_code == 200
+    assert [s["id"] for s in resp.json()["sources"]] == ["mock1"]
+
+
+def test_ask_rejects_malformed_filter(client):
+    """A malformed date filter is a 422, not 200 with every source skipped"""
+    headers = {"Authorization": f"Bearer {get_token(client)}"}
+    payload = {"question": "Python?", "filters": {"date_from": "last year"}}
+    resp = client.post("/ask", json=payload, headers=headers)
+    assert resp.status_code == 422
+    assert "date_from" in resp.text
+
+
+def test_ask_reports_skipped_sources(client, monkeypatch):
+    """A failing retriever is skipped and reported; the rest still answer"""
+    from app.retrievers import registry
+
+    monkeypatch.setitem(registry.RESILIENT_RETRIEVERS, "broken", BrokenRetriever())
+    monkeypatch.setattr("app.main.llm_gateway", FakeGateway())
+    headers = {"Authorization": f"Bearer {get_token(client)}"}
+    payload = {"question": "Python?", "sources": ["mock", "broken"]}
+    resp = client.post("/ask", json=payload, headers=headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["skipped_sources"] == ["broken"]
+    assert data["answer"] == "stub answer"
+    assert {s["type"] for s in data["sources"]} == {"mock"}
+
+
+# --------- Profiling Tests ---------
+
+
+def test_profile_header_captures_profile(client):
+    """X-Profile with a valid token stores a downloadable collapsed-stack profile"""
+    headers = {"Authorization": f"Bearer {get_token(client)}"}
+    resp = client.get("/resume/source", headers={**headers, "X-Profile": "1"})
+    assert resp.status_code == 200
+    profile_id = resp.headers["X-Profile-Id"]
+
+    listed = client.get("/admin/profiles", headers=headers).json()
+    summary = next(p for p in listed if p["id"] == profile_id)
+    assert summary["samples"] > 0
+
+    resp = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+    assert resp.status_code == 200
+    assert resp.text
+    for line in resp.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+
+
+@pytest.mark.parametrize("auth", [None, "Bearer not_a_real_token"])
+def test_profile_header_ignored_without_valid_token(client, auth):
+    """Anonymous clients can't force profiling with X-Profile"""
+    headers = {"X-Profile": "1"}
+    if auth:
+        headers["Authorization"] = auth
+    resp = client.get("/resume/source", headers=headers)
+    assert resp.status_code == 200
+    assert "X-Profile-Id" not in resp.headers
+
+
+def test_profiling_adds_no_http_middleware_wrapper():
+    """Unprofiled requests must not pay for a BaseHTTPMiddleware hop"""
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    assert all(not issubclass(m.cls, BaseHTTPMiddleware) for m in app.user_middleware)
+
+
+def test_admin_profiles_require_auth(client):
+    resp = client.get("/admin/profiles")
+    assert resp.status_code == 401
+
+
 # --------- Parameterized Edge/Role/Perf (Stubs) ---------
 
 
@@ -0,0 +1,43 @@
+import chromadb
+import pytest
+
+from app.retrievers.chroma import ChromaRetriever
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    class FakeEmbeddings:
+        def embed_query(self, text):
+            return [1.0, 0.0, 0.0]
+
+    monkeypatch.setattr("app.retrievers.chroma.get_embeddings", FakeEmbeddings)
+
+
+def test_collections_created_after_startup_are_searched(tmp_path, fake_embeddings):
+    """A retriever started before ingestion picks up new docs_* collections"""
+    path = str(tmp_path / "chroma")
+    retriever = ChromaRetriever(path, refresh_seconds=3600)
+    assert list(retriever.collections) == ["default"]
+    assert retriever.retrieve("python") == []
+
+    # Ingestion (another client on the same DB) adds a per-type collection
+    chromadb.PersistentClient(path=path).create_collection("docs_resume").add(
+        ids=["c1"],
+        documents=["Python test automation"],
+        embeddings=[[1.0, 0.0, 0.0]],
+        metadatas=[{"doc_type": "resume", "title": "resume.txt"}],
+    )
+    assert retriever.retrieve("python") == []  # not refreshed yet
+
+    retriever.refresh()
+    assert list(retriever.collections) == ["docs_resume"]
+    hits = retriever.retrieve("python", filters={"doc_type": "resume"})
+    assert [h["id"] for h in hits] == ["c1"]
+
+
+def test_collections_refresh_after_ttl(tmp_path, fake_embeddings):
+    path = str(tmp_path / "chroma")
+    retriever = ChromaRetriever(path, refresh_seconds=0)
+    chromadb.PersistentClient(path=path).create_collection("docs_letter")
+    retriever.retrieve("q")
+    assert list(retriever.collections) == ["docs_letter"]
@@ -0,0 +1,105 @@
+import pytest
+
+from app import embeddings
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Switch EMBEDDING_PROVIDER for one test (and reset the cached model)"""
+
+    def select(name):
+        monkeypatch.setattr(embeddings, "EMBEDDING_PROVIDER", name)
+        embeddings.get_embeddings.cache_clear()
+
+    yield select
+    embeddings.get_embeddings.cache_clear()
+
+
+def test_openai_provider_selected(provider, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    provider("openai")
+    assert type(embeddings.get_embeddings()).__name__ == "OpenAIEmbeddings"
+    meta = embeddings.embedding_metadata()
+    assert meta["embedding_provider"] == "openai"
+    assert meta["embedding_model"] == embeddings.get_embeddings().model
+
+
+def test_local_provider_selected(provider, monkeypatch):
+    class FakeLocal:
+        pass
+
+    monkeypatch.setattr(embeddings, "LocalEmbeddings", FakeLocal)
+    provider("local")
+    assert isinstance(embeddings.get_embeddings(), FakeLocal)
+    assert embeddings.embedding_metadata() == {
+        "embedding_provider": "local",
+        "embedding_model": embeddings.LOCAL_EMBEDDING_MODEL,
+    }
+
+
+def test_unknown_provider_rejected(provider):
+    provider("bogus")
+    with pytest.raises(ValueError, match="Unknown EMBEDDING_PROVIDER"):
+        embeddings.get_embeddings()
+
+
+def test_embed_documents_batches():
+    """Documents are encoded in batch_size chunks, preserving order"""
+    local = embeddings.LocalEmbeddings.__new__(embeddings.LocalEmbeddings)
+    local.batch_size = 2
+    batches = []
+
+    def fake_encode(texts):
+        batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    local._encode = fake_encode
+    vectors = local.embed_documents(["a", "bb", "ccc", "dddd", "eeeee"])
+    assert batches == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+    assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+
+
+def test_local_encode_mean_pools_with_stub_model(monkeypatch):
+    """Full LocalEmbeddings path with a stubbed tokenizer/model (needs torch)"""
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+
+    class StubTokenizer:
+        def __call__(self, texts, **kwargs):
+            # Second token is padding for one-word texts
+            mask = [[1, 1 if " " in t else 0] for t in texts]
+            return {
+                "input_ids": torch.ones(len(texts), 2, dtype=torch.long),
+                "attention_mask": torch.tensor(mask),
+            }
+
+    class StubOutput:
+        def __init__(self, hidden):
+            self.last_hidden_state = hidden
+
+    class StubModel:
+        calls = 0
+
+        def eval(self):
+            return self
+
+        def __call__(self, input_ids, attention_mask):
+            StubModel.calls += 1
+            n = input_ids.shape[0]
+            token0 = torch.tensor([3.0, 0.0]).repeat(n, 1)
+            token1 = torch.tensor([0.0, 4.0]).repeat(n, 1)
+            return StubOutput(torch.stack([token0, token1], dim=1))
+
+    monkeypatch.setattr(
+        transformers.AutoTokenizer, "from_pretrained", lambda name: StubTokenizer()
+    )
+    monkeypatch.setattr(
+        transformers.AutoModel, "from_pretrained", lambda name: StubModel()
+    )
+    local = embeddings.LocalEmbeddings(model_name="stub", num_threads=1, batch_size=2)
+    vectors = local.embed_documents(["one", "two words", "three"])
+
+    assert StubModel.calls == 2
+    assert vectors[0] == pytest.approx([1.0, 0.0])  # padding token ignored
+    assert vectors[1] == pytest.approx([0.6, 0.8])  # mean of both, L2-normalised
+    assert local.embed_query("one") == pytest.approx([1.0, 0.0])
@@ -0,0 +1,62 @@
+import pytest
+from pydantic import ValidationError
+
+from app.query_models import RetrievalFilters
+from app.retrievers.base import RetrievalRequestError
+from app.retrievers.filters import (
+    build_chroma_where,
+    document_metadata,
+    matches_filters,
+    parse_filter_date,
+)
+from app.retrievers.mock import MockRetriever
+
+
+def test_document_metadata_from_file_name():
+    """Ingestion derives doc type, date and tags from the file name"""
+    meta = document_metadata(
+        "app/docs/SDET_Automation_LLM_Philip_GeLinas_Resume_ 07212025.docx"
+    )
+    assert meta["doc_type"] == "resume"
+    assert meta["doc_date"] == 202507
+    assert meta["tag_sdet"] and meta["tag_llm"]
+    assert meta["source_file"].startswith("SDET_Automation")
+
+
+def test_build_chroma_where():
+    """Filters become a single clause or an $and of clauses"""
+    assert build_chroma_where({}) is None
+    assert build_chroma_where({"doc_type": "resume"}) == {"doc_type": "resume"}
+    assert build_chroma_where({"tags": ["SDET"], "date_from": "2024"}) == {
+        "$and": [{"tag_sdet": True}, {"doc_date": {"$gte": 202401}}]
+    }
+
+
+def test_matches_filters_mirrors_where_semantics():
+    meta = {"doc_type": "resume", "doc_date": 202303, "tag_python": True}
+    assert matches_filters(meta, {})
+    assert matches_filters(meta, {"doc_type": "resume", "tags": ["python"]})
+    assert matches_filters(meta, {"date_from": "2023-01", "date_to": "2023"})
+    assert not matches_filters(meta, {"doc_type": "letter"})
+    assert not matches_filters(meta, {"tags": ["python", "java"]})
+    assert not matches_filters(meta, {"date_to": "2022-12"})
+
+
+def test_mock_retriever_applies_filters():
+    results = MockRetriever().retrieve("python", filters={"doc_type": "portfolio"})
+    assert [r["id"] for r in results] == ["mock2"]
+
+
+@pytest.mark.parametrize("value", ["last year", "2024-13", "2024-00", "24-01", ""])
+def test_invalid_filter_dates_are_rejected(value):
+    """Bad dates fail validation instead of erroring inside a retriever"""
+    with pytest.raises(RetrievalRequestError):
+        parse_filter_date(value)
+    with pytest.raises(ValidationError):
+        RetrievalFilters(date_from=value)
+
+
+def test_filter_date_parsing():
+    assert parse_filter_date("2024") == 202401
+    assert parse_filter_date("2024", end=True) == 202412
+    assert RetrievalFilters(date_to="2023-06").date_to == "2023-06"
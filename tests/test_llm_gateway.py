@@ -0,0 +1,129 @@
+import asyncio
+
+from app.llm_gateway import BULK, INTERACTIVE, AdaptiveLimiter, LLMGateway
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """Async stand-in for ChatOpenAI that records prompts in call order."""
+
+    def __init__(self, delay=0.01, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    async def ainvoke(self, prompt):
+        self.calls.append(prompt)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return FakeMessage(f"answer to {prompt}")
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_identical_prompts_share_one_call():
+    """Concurrent identical prompts are coalesced into one upstream call"""
+    llm = FakeLLM()
+    gateway = LLMGateway(llm)
+
+    async def run():
+        return await asyncio.gather(*(gateway.ainvoke("same") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert llm.calls == ["same"]
+    assert {r.content for r in results} == {"answer to same"}
+
+
+def test_interactive_admitted_before_bulk():
+    """With one slot busy, queued interactive calls jump queued bulk calls"""
+    llm = FakeLLM()
+    gateway = LLMGateway(llm, AdaptiveLimiter(initial=1, min_limit=1, max_limit=1))
+
+    async def run():
+        first = asyncio.ensure_future(gateway.ainvoke("first", INTERACTIVE))
+        await asyncio.sleep(0)
+        bulk = asyncio.ensure_future(gateway.ainvoke("bulk", BULK))
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(gateway.ainvoke("ask", INTERACTIVE))
+        await asyncio.gather(first, bulk, interactive)
+
+    asyncio.run(run())
+    assert llm.calls == ["first", "ask", "bulk"]
+
+
+def test_rate_limit_backs_off():
+    """A 429 halves the concurrency limit; fast successes grow it again"""
+    limiter = AdaptiveLimiter(initial=8, min_limit=2, max_limit=16)
+    gateway = LLMGateway(FakeLLM(error=RateLimitError()), limiter, max_retries=0)
+
+    async def run():
+        try:
+            await gateway.ainvoke("boom")
+        except RateLimitError:
+            pass
+
+    asyncio.run(run())
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+    limiter.on_success(latency=0.01)
+    assert limiter.limit > 4
+
+
+class FlakyLLM(FakeLLM):
+    """Answers 429 for the first `failures` calls, then succeeds."""
+
+    def __init__(self, limiter, failures=1):
+        super().__init__()
+        self.limiter = limiter
+        self.failures = failures
+        self.seen = []  # (limit, in_flight) when each call starts
+
+    async def ainvoke(self, prompt):
+        self.seen.append((self.limiter.limit, self.limiter.in_flight))
+        if len(self.seen) <= self.failures:
+            raise RateLimitError()
+        return await super().ainvoke(prompt)
+
+
+def test_retry_happens_in_gateway_after_backoff():
+    """A 429 hits the limiter on the first attempt; the retry takes a new slot"""
+    limiter = AdaptiveLimiter(initial=8, min_limit=2, max_limit=16)
+    llm = FlakyLLM(limiter)
+    gateway = LLMGateway(llm, limiter, max_retries=2, retry_base=0.01)
+
+    async def run():
+        task = asyncio.ensure_future(gateway.ainvoke("q"))
+        await asyncio.sleep(0.002)
+        in_flight_during_backoff = limiter.in_flight
+        return await task, in_flight_during_backoff
+
+    result, in_flight_during_backoff = asyncio.run(run())
+    assert result.content == "answer to q"
+    assert llm.seen == [(8, 1), (4, 1)]  # limit already cut before the retry
+    assert in_flight_during_backoff == 0
+    assert limiter.in_flight == 0
+
+
+def test_non_retryable_errors_are_not_retried():
+    llm = FakeLLM(error=ValueError("bad prompt"))
+    gateway = LLMGateway(llm, max_retries=2, retry_base=0.01)
+    try:
+        asyncio.run(gateway.ainvoke("q"))
+    except ValueError:
+        pass
+    assert llm.calls == ["q"]
+
+
+def test_app_llm_has_no_sdk_retries():
+    """SDK retries would hold a gateway slot and hide 429s from the limiter"""
+    from app.main import llm
+
+    assert llm.max_retries == 0
@@ -0,0 +1,71 @@
+from argparse import Namespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from loadtest.run import build_request, check_report, percentile
+from loadtest.stub_llm import StubConfig, create_stub_app
+
+CHAT = {"model": "stub", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def test_percentile_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 99) == 5
+    assert percentile(values, 0) == 1
+    assert percentile([], 99) == 0.0
+
+
+def test_build_request_payloads():
+    assert build_request("ask", ["mock"])[:2] == ("ask", "/ask")
+    assert build_request("ask", ["mock"])[2]["sources"] == ["mock"]
+    assert "sources" not in build_request("ask", None)[2]
+    kind, path, payload = build_request("intake", None)
+    assert (kind, path) == ("intake", "/job/intake")
+    assert payload["job_description"]
+    assert build_request("mix", None)[0] in ("ask", "intake")
+
+
+def stub_client(**overrides):
+    config = StubConfig(latency_ms=0, jitter_ms=0, tokens_per_sec=0, **overrides)
+    config.embedding_latency_ms = 0
+    return TestClient(create_stub_app(config))
+
+
+def test_stub_answers_chat_and_embeddings():
+    client = stub_client()
+    chat = client.post("/v1/chat/completions", json=CHAT)
+    assert chat.status_code == 200
+    assert chat.json()["choices"][0]["message"]["content"]
+    emb = client.post("/v1/embeddings", json={"input": ["a", "b"], "model": "stub"})
+    assert len(emb.json()["data"]) == 2
+    assert client.get("/stats").json() == {"chat": 1, "embeddings": 1}
+
+
+@pytest.mark.parametrize(
+    "overrides,status",
+    [({"rate_limit_rate": 1.0}, 429), ({"error_rate": 1.0}, 500)],
+)
+def test_stub_injects_errors(overrides, status):
+    client = stub_client(**overrides)
+    assert client.post("/v1/chat/completions", json=CHAT).status_code == status
+    resp = client.post("/v1/embeddings", json={"input": "a"})
+    assert resp.status_code == status
+    if status == 429:
+        assert resp.headers["retry-after"] == "1"
+
+
+def test_check_report_flags_degraded_runs():
+    """Skipped retrievers or no embedding calls mean the numbers are misleading"""
+    args = Namespace(endpoint="mix", sources=None)
+    report = {"skipped_sources": {}, "stub_calls": {"chat": 5, "embeddings": 9}}
+    assert check_report(report, args) == []
+
+    report = {"skipped_sources": {"chroma": 3}, "stub_calls": {"embeddings": 0}}
+    problems = check_report(report, args)
+    assert "retriever 'chroma' was skipped in 3 /ask responses" in problems
+    assert any("embeddings" in p for p in problems)
+
+    mock_only = Namespace(endpoint="ask", sources=["mock"])
+    assert check_report({"skipped_sources": {}, "stub_calls": {}}, mock_only) == []
@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+
+from app.retrievers.base import RetrievalRequestError, Retriever
+from app.retrievers.health import (
+    Bulkhead,
+    CircuitBreaker,
+    ResilientRetriever,
+    RetrieverUnavailable,
+)
+
+
+class StubRetriever(Retriever):
+    def __init__(self, label, delay=0.0, error=None):
+        self.label = label
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def retrieve(self, query: str, **kwargs) -> list:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [{"type": self.label, "snippet": query}]
+
+
+def test_breaker_opens_after_threshold_and_recovers():
+    """Breaker rejects calls once open, then allows a half-open trial"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_skips_backend():
+    """After repeated failures the broken backend isn't called at all"""
+    broken = StubRetriever("chroma", error=RuntimeError("database is locked"))
+    retriever = ResilientRetriever("chroma", broken)
+    retriever.breakers[0].failure_threshold = 1
+
+    with pytest.raises(RetrieverUnavailable):
+        asyncio.run(retriever.aretrieve("q"))
+    with pytest.raises(RetrieverUnavailable, match="circuit open"):
+        asyncio.run(retriever.aretrieve("q"))
+    assert broken.calls == 1
+
+
+def test_slow_backend_times_out():
+    """A slow backend is abandoned at the timeout instead of stalling /ask"""
+    retriever = ResilientRetriever("chroma", StubRetriever("chroma", delay=0.5), [])
+    retriever.timeout = 0.05
+
+    async def timed():
+        start = time.perf_counter()
+        with pytest.raises(RetrieverUnavailable, match="timed out"):
+            await retriever.aretrieve("q")
+        return time.perf_counter() - start
+
+    assert asyncio.run(timed()) < 0.5
+    assert retriever.breakers[0].failures == 1
+
+
+def test_hedged_request_uses_fast_replica():
+    """If the primary is slow, the hedge to a replica answers first"""
+    primary = StubRetriever("primary", delay=0.5)
+    replica = StubRetriever("replica")
+    retriever = ResilientRetriever("chroma", primary, [replica], hedge_delay=0.02)
+
+    results = asyncio.run(retriever.aretrieve("q"))
+    assert results[0]["type"] == "replica"
+
+
+def test_hung_backend_does_not_starve_others():
+    """Each backend has its own bulkhead; a full one fails fast"""
+    hung = ResilientRetriever("chroma", StubRetriever("chroma", delay=0.3), [])
+    hung.timeout = 0.02
+    hung.bulkheads[0] = Bulkhead("chroma", max_concurrent=2, max_queue=0)
+    healthy = ResilientRetriever("mock", StubRetriever("mock"), [])
+
+    async def run():
+        for _ in range(2):  # both hung threads keep running after the timeout
+            with pytest.raises(RetrieverUnavailable, match="timed out"):
+                await hung.aretrieve("q")
+        start = time.perf_counter()
+        with pytest.raises(RetrieverUnavailable, match="calls still in flight"):
+            await hung.aretrieve("q")
+        assert time.perf_counter() - start < 0.02
+        return await asyncio.gather(*(healthy.aretrieve("q") for _ in range(50)))
+
+    results = asyncio.run(run())
+    assert all(r[0]["type"] == "mock" for r in results)
+    # Only the two real timeouts count against the breaker
+    assert hung.breakers[0].failures == 2
+    time.sleep(0.35)  # slots are freed once the hung threads really finish
+    assert hung.bulkheads[0].in_flight == 0
+
+
+def test_caller_errors_do_not_trip_breaker():
+    """Bad requests propagate unchanged, without hedging or breaker failures"""
+    primary = StubRetriever("primary", error=RetrievalRequestError("bad date"))
+    replica = StubRetriever("replica")
+    retriever = ResilientRetriever("chroma", primary, [replica], hedge_delay=0.5)
+    retriever.breakers[0].failure_threshold = 1
+
+    for _ in range(3):
+        with pytest.raises(RetrievalRequestError, match="bad date"):
+            asyncio.run(retriever.aretrieve("q"))
+    assert retriever.breakers[0].state == CircuitBreaker.CLOSED
+    assert replica.calls == 0
+
+
+def test_backend_type_error_trips_breaker():
+    """A TypeError from a backend bug is a backend failure, not a caller error"""
+    broken = StubRetriever("primary", error=TypeError("'NoneType' not subscriptable"))
+    replica = StubRetriever("replica")
+    retriever = ResilientRetriever("chroma", broken, [replica], hedge_delay=0.5)
+    retriever.breakers[0].failure_threshold = 1
+
+    results = asyncio.run(retriever.aretrieve("q"))
+    assert results[0]["type"] == "replica"  # failed over to the replica
+    assert retriever.breakers[0].state == CircuitBreaker.OPEN
+    asyncio.run(retriever.aretrieve("q"))
+    assert broken.calls == 1
@@ -0,0 +1,82 @@
+from app.models.source_of_truth import SourceOfTruth
+from app.scoring import ScoringEngine, recency_bucket
+
+PROFILE = SourceOfTruth.model_validate(
+    {
+        "experiences": [
+            {
+                "id": "exp-new",
+                "title": "SDET",
+                "employer": "Acme",
+                "start_date": "2022-01",
+                "end_date": "2024-06",
+                "description": "",
+                "skills": ["Python", "Selenium"],
+                "projects": [],
+                "outcomes": ["Faster releases"],
+            },
+            {
+                "id": "exp-old",
+                "title": "QA Analyst",
+                "employer": "Initech",
+                "start_date": "2010-01",
+                "end_date": "2015-06",
+                "description": "",
+                "skills": ["Python"],
+                "projects": [],
+                "outcomes": [],
+            },
+        ],
+        "projects": [
+            {
+                "id": "proj-api",
+                "name": "Python",  # same name as a skill: deduplicated
+                "summary": "",
+                "tech_stack": ["FastAPI"],
+                "outcomes": [],
+            }
+        ],
+        "skills": [
+            {
+                "name": "Python",
+                "type": "language",
+                "proficiency": "expert",
+                "evidence": ["exp-new", "exp-old", "missing-id"],
+            },
+            {"name": "Java", "type": "language", "proficiency": "ok", "evidence": []},
+        ],
+        "certifications": [],
+        "education": [],
+    }
+)
+
+
+def test_recency_buckets():
+    assert recency_bucket("2024-06", 2025) == 0
+    assert recency_bucket("2020-01", 2025) == 1
+    assert recency_bucket("2015-06", 2025) == 2
+
+
+def test_scores_and_order():
+    """Scores: skill 2 + evidence, recent experience 3, older experience 2"""
+    engine = ScoringEngine(PROFILE, reference_year=2025)
+    matches = engine.top_matches("Senior Python engineer, FastAPI a plus")
+    assert [(m["type"], m.get("name") or m["title"], m["score"]) for m in matches] == [
+        ("skill", "Python", 4),
+        ("experience", "SDET", 3),
+        ("experience", "QA Analyst", 2),
+    ]
+    assert matches[1]["recent"] is True
+    assert matches[1]["reason"].endswith("skill 'Python' found in job description")
+    assert [e["title"] for e in matches[0]["evidence"]] == ["SDET", "QA Analyst"]
+
+
+def test_top_n_cutoff():
+    engine = ScoringEngine(PROFILE, reference_year=2025)
+    matches = engine.top_matches("python and java", top_n=2)
+    assert [m["score"] for m in matches] == [4, 3]
+
+
+def test_no_matches():
+    engine = ScoringEngine(PROFILE, reference_year=2025)
+    assert engine.top_matches("cobol mainframe") == []
@@ -0,0 +1,136 @@
+import asyncio
+import time
+
+import pytest
+
+from app.retrievers.base import RetrievalRequestError, Retriever
+from app.retrievers.mock import MockRetriever
+from app.sidecar import IndexSidecar, ResultCache
+
+
+class CountingRetriever(MockRetriever):
+    def __init__(self):
+        self.calls = 0
+        self.refreshes = 0
+
+    def refresh(self):
+        self.refreshes += 1
+
+    def retrieve(self, query: str, **kwargs) -> list:
+        self.calls += 1
+        return super().retrieve(query, **kwargs)
+
+
+def test_cache_hit_miss_and_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.sidecar.time.monotonic", lambda: now[0])
+    cache = ResultCache(maxsize=2, ttl=10)
+
+    assert cache.get("a") is None
+    cache.put("a", [1])
+    assert cache.get("a") == [1]
+    now[0] += 11  # expired
+    assert cache.get("a") is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 2}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_dispatch_retrieve_is_cached_until_invalidated():
+    retriever = CountingRetriever()
+    sidecar = IndexSidecar(retrievers={"mock": retriever})
+
+    async def run():
+        request = {"op": "retrieve", "retriever": "mock", "query": "python"}
+        first = await sidecar.dispatch(dict(request))
+        second = await sidecar.dispatch(dict(request))
+        assert first == second
+        assert retriever.calls == 1
+        assert await sidecar.dispatch({"op": "invalidate"}) == {"removed": 1}
+        assert retriever.refreshes == 1  # re-reads collections ingestion added
+        await sidecar.dispatch(dict(request))
+        assert retriever.calls == 2
+        return await sidecar.dispatch({"op": "stats"})
+
+    stats = asyncio.run(run())
+    assert stats["retrievers"] == ["mock"]
+    assert stats["cache"]["hits"] == 1
+
+
+class SlowRetriever(Retriever):
+    def retrieve(self, query: str, **kwargs) -> list:
+        time.sleep(0.5)
+        return [{"type": "slow"}]
+
+
+def test_sidecar_hedges_to_replicas():
+    """Replicas live in the sidecar, so hedging works in shared mode"""
+    sidecar = IndexSidecar(
+        retrievers={"chroma": SlowRetriever()},
+        replicas={"chroma": [CountingRetriever()]},
+    )
+    sidecar.retrievers["chroma"].hedge_delay = 0.02
+    request = {"op": "retrieve", "retriever": "chroma", "query": "python"}
+    result = asyncio.run(sidecar.dispatch(request))
+    assert result[0]["id"] == "mock1"
+
+
+def test_caller_errors_cross_the_socket(monkeypatch, tmp_path):
+    """A bad request in the sidecar surfaces as RetrievalRequestError in workers"""
+    from app import sidecar_client
+
+    class Rejecting(Retriever):
+        def retrieve(self, query: str, **kwargs) -> list:
+            raise RetrievalRequestError("bad filter")
+
+    path = str(tmp_path / "index.sock")
+    monkeypatch.setattr(sidecar_client, "SHARED_INDEX_SOCKET", path)
+    sidecar = IndexSidecar(retrievers={"mock": Rejecting()})
+
+    async def run():
+        server = await asyncio.start_unix_server(sidecar.handle, path=path)
+        async with server:
+            with pytest.raises(RetrievalRequestError, match="bad filter"):
+                await asyncio.to_thread(
+                    sidecar_client.sidecar_call,
+                    "retrieve",
+                    retriever="mock",
+                    query="q",
+                )
+
+    asyncio.run(run())
+    assert sidecar.retrievers["mock"].breakers[0].failures == 0
+
+
+def test_dispatch_unknown_retriever():
+    sidecar = IndexSidecar(retrievers={})
+    request = {"op": "retrieve", "retriever": "nope", "query": "q"}
+    with pytest.raises(KeyError, match="Unknown retriever"):
+        asyncio.run(sidecar.dispatch(request))
+
+
+def test_dispatch_unknown_op():
+    sidecar = IndexSidecar(retrievers={})
+    with pytest.raises(ValueError, match="Unknown op"):
+        asyncio.run(sidecar.dispatch({"op": "drop_tables"}))
+
+
+def test_request_calls_fail_fast_when_sidecar_is_down(monkeypatch, tmp_path):
+    """Only the startup wait retries; a dead sidecar fails request calls at once"""
+    from app import sidecar_client
+
+    monkeypatch.setattr(
+        sidecar_client, "SHARED_INDEX_SOCKET", str(tmp_path / "gone.sock")
+    )
+    start = time.perf_counter()
+    with pytest.raises(sidecar_client.SidecarError, match="Could not connect"):
+        sidecar_client.sidecar_call("ping")
+    assert time.perf_counter() - start < 0.1